@@ -0,0 +1,180 @@
+"""
+Load test: issue CRUD latency while the chatbot is saturated.
+
+Starts gunicorn with gunicorn.conf.py on a temporary SQLite database, with
+the OpenAI API replaced by the local stub server (benchmarks/stub_openai.py)
+answering after --llm-latency seconds and the response/LLM caches disabled so
+every chat message reaches the "model". It measures GET/PATCH issue
+latency first alone, then while --chat-clients keep /chat busy.
+
+Usage (from the bug_tracker folder):
+    python -m benchmarks.chat_load
+    python -m benchmarks.chat_load --worker-class sync   # the old setup
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import init_database  # noqa: E402
+from benchmarks.stub_openai import StubOpenAIServer  # noqa: E402
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _request(url, method='GET', payload=None, timeout=60):
+    data = json.dumps(payload).encode() if payload is not None else None
+    req = urllib.request.Request(url, data=data, method=method,
+                                 headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(req, timeout=timeout) as response:
+        return response.status, response.read()
+
+
+def _percentile(values, pct):
+    if not values:
+        return float('nan')
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _crud_client(base, issue_ids, stop, latencies, errors):
+    while not stop.is_set():
+        issue_id = random.choice(issue_ids)
+        started = time.perf_counter()
+        try:
+            if random.random() < 0.2:
+                _request(f'{base}/issues/{issue_id}/status', 'PATCH',
+                         {'status': random.choice(['Open', 'In-Progress'])})
+            else:
+                _request(f'{base}/issues/{issue_id}')
+            latencies.append(time.perf_counter() - started)
+        except (urllib.error.URLError, OSError):
+            errors.append(1)
+
+
+def _chat_client(base, stop, counts, lock, think_time):
+    messages = ['what is alex working on', 'top priority tasks', 'show me open issues']
+    while not stop.is_set():
+        try:
+            _, body = _request(f'{base}/chat', 'POST', {'message': random.choice(messages)})
+            outcome = 'llm' if json.loads(body).get('message') == 'stub-llm-answer' else 'fallback'
+        except (urllib.error.URLError, OSError):
+            outcome = 'error'
+        with lock:
+            counts[outcome] += 1
+        stop.wait(think_time)
+
+
+def _measure(base, issue_ids, args, chat_clients):
+    stop = threading.Event()
+    latencies, errors = [], []
+    counts = {'llm': 0, 'fallback': 0, 'error': 0}
+    lock = threading.Lock()
+    threads = [threading.Thread(target=_chat_client,
+                                args=(base, stop, counts, lock, args.chat_think_time))
+               for _ in range(chat_clients)]
+    for thread in threads:
+        thread.start()
+    if chat_clients:
+        time.sleep(args.llm_latency)  # let the chat load build up
+    crud = [threading.Thread(target=_crud_client, args=(base, issue_ids, stop, latencies, errors))
+            for _ in range(args.crud_clients)]
+    for thread in crud:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    for thread in threads + crud:
+        thread.join()
+    return latencies, errors, counts
+
+
+def _report(label, latencies, errors, counts, duration):
+    ms = [value * 1000 for value in latencies]
+    print(f"{label:<22} {len(ms) / duration:7.1f} req/s  "
+          f"p50 {_percentile(ms, 50):7.1f} ms  p95 {_percentile(ms, 95):7.1f} ms  "
+          f"p99 {_percentile(ms, 99):7.1f} ms  errors {len(errors)}")
+    if counts and any(counts.values()):
+        print(f"{'':<22} chat answers: {counts['llm']} from the model, "
+              f"{counts['fallback']} fallback, {counts['error']} failed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--worker-class', default='gthread', choices=['gthread', 'sync'])
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--chat-clients', type=int, default=24)
+    parser.add_argument('--chat-think-time', type=float, default=0.5,
+                        help='pause of each chat client between messages, in seconds')
+    parser.add_argument('--crud-clients', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--issues', type=int, default=10000,
+                        help='synthetic issues in the database (flask generate-data)')
+    parser.add_argument('--llm-latency', type=float, default=2.0,
+                        help='seconds the stub OpenAI server takes per completion')
+    args = parser.parse_args()
+
+    if args.worker_class == 'sync':
+        args.threads = 1  # gunicorn switches to gthread for more threads
+    workdir = tempfile.mkdtemp(prefix='chat-load-')
+    port = _free_port()
+    base = f'http://127.0.0.1:{port}'
+
+    with StubOpenAIServer(latency=args.llm_latency, reply='stub-llm-answer') as stub:
+        env = dict(
+            os.environ,
+            DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+            OPENAI_API_KEY='stub-key',
+            OPENAI_BASE_URL=stub.base_url,
+            RESPONSE_CACHE_SIZE='0',
+            LLM_CACHE_SIZE='0',
+        )
+        # Create and fill the database once, before the workers start
+        init_database(env, issues=args.issues)
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+             '--bind', f'127.0.0.1:{port}', '--worker-class', args.worker_class,
+             '--workers', str(args.workers), '--threads', str(args.threads),
+             '--log-level', 'warning', 'app:app'],
+            cwd=BASE_DIR, env=env,
+        )
+        try:
+            for _ in range(100):
+                try:
+                    _, body = _request(f'{base}/issues?limit=50', timeout=2)
+                    break
+                except (urllib.error.URLError, OSError):
+                    time.sleep(0.2)
+            else:
+                sys.exit('gunicorn did not start')
+            issue_ids = [issue['id'] for issue in json.loads(body)]
+
+            print(f"gunicorn {args.worker_class}: {args.workers} workers"
+                  + (f" x {args.threads} threads" if args.worker_class == 'gthread' else '')
+                  + f"; {args.chat_clients} chat clients, LLM latency {args.llm_latency}s")
+            _report('CRUD alone', *_measure(base, issue_ids, args, 0), args.duration)
+            _report('CRUD + saturated chat', *_measure(base, issue_ids, args, args.chat_clients),
+                    args.duration)
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,319 @@
+"""
+Endpoint benchmark with stored baselines: fails when an endpoint regresses.
+
+Creates a temporary SQLite database with ``flask init-db`` and
+``flask generate-data`` (--issues synthetic issues, --seed), then serves the
+app from a separate process (``--serve``: the threaded werkzeug server around
+the app built by create_app()) with the OpenAI API replaced by the local stub
+server (benchmarks/stub_openai.py) and the response/LLM caches disabled, so
+every request runs its queries and every chat message reaches the "model".
+
+Each endpoint below gets --warmup unmeasured requests, then --requests
+requests from --concurrency keep-alive client threads, and reports:
+
+- throughput (requests per second of wall time) and p50/p95/p99 latency;
+- SQL statements per request, from the ``Server-Timing`` header (metrics.py);
+- peak RSS of the server process while the endpoint ran (VmHWM, reset
+  before every endpoint through /proc/<pid>/clear_refs on Linux).
+
+The results are compared with --baseline (benchmarks/baseline.json). An
+endpoint regresses when it runs more SQL statements than its baseline, or
+its p95 latency, throughput or peak RSS is worse by more than --tolerance
+(--rss-tolerance for RSS); the script then exits with status 1. Failed
+requests exit with status 2. Latency baselines are only meaningful on the
+machine that recorded them: record one per CI runner with --update-baseline.
+
+Usage (from the bug_tracker folder):
+    python -m benchmarks.endpoints
+    python -m benchmarks.endpoints --update-baseline
+    python -m benchmarks.endpoints --issues 100000 --baseline /tmp/large.json
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import init_database  # noqa: E402
+from benchmarks.stub_openai import StubOpenAIServer  # noqa: E402
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(BASE_DIR, 'benchmarks', 'baseline.json')
+
+# Latencies below this many milliseconds of difference are noise, whatever
+# the tolerance says
+LATENCY_SLACK_MS = 2.0
+
+CHAT_MESSAGES = ('what is alex working on', 'top priority tasks', 'show me open issues',
+                 'issues assigned to maddy', 'what is overdue')
+STATUSES = ('Open', 'In-Progress', 'Closed')
+
+
+def _endpoints(issue_ids, assignee_id):
+    """(name, request factory) pairs; a factory takes a Random and returns
+    (method, path, JSON payload or None)"""
+    return [
+        ('GET /issues', lambda rng: ('GET', '/issues', None)),
+        ('GET /issues?title', lambda rng: ('GET', '/issues?title=login', None)),
+        ('GET /issues?status', lambda rng: ('GET', f'/issues?status={rng.choice(STATUSES)}', None)),
+        ('GET /issues?priority', lambda rng: ('GET', '/issues?priority=High', None)),
+        ('GET /issues?assignee_id', lambda rng: ('GET', f'/issues?assignee_id={assignee_id}', None)),
+        ('GET /issues?assignee', lambda rng: ('GET', '/issues?assignee=alex', None)),
+        ('GET /issues/<id>', lambda rng: ('GET', f'/issues/{rng.choice(issue_ids)}', None)),
+        ('PATCH /issues/<id>/status',
+         lambda rng: ('PATCH', f'/issues/{rng.choice(issue_ids)}/status',
+                      {'status': rng.choice(STATUSES)})),
+        ('GET /users', lambda rng: ('GET', '/users', None)),
+        ('POST /chat', lambda rng: ('POST', '/chat', {'message': rng.choice(CHAT_MESSAGES)})),
+    ]
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _percentile(values, pct):
+    if not values:
+        return float('nan')
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _sql_queries(response):
+    match = re.search(r'desc="(\d+) queries"', response.getheader('Server-Timing') or '')
+    return int(match.group(1)) if match else None
+
+
+def _peak_rss_kb(pid):
+    with open(f'/proc/{pid}/status') as status:
+        for line in status:
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1])
+    return None
+
+
+def _reset_peak_rss(pid):
+    try:
+        with open(f'/proc/{pid}/clear_refs', 'w') as clear_refs:
+            clear_refs.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def serve(port):
+    """The ``--serve`` process: the app on a threaded werkzeug server"""
+    from werkzeug.serving import make_server
+    from app import app
+
+    make_server('127.0.0.1', port, app, threaded=True).serve_forever()
+
+
+def _client(port, factory, seed, count, results):
+    """Send ``count`` requests on one keep-alive connection"""
+    rng = random.Random(seed)
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    try:
+        for _ in range(count):
+            method, path, payload = factory(rng)
+            body = json.dumps(payload) if payload is not None else None
+            headers = {'Content-Type': 'application/json'} if body is not None else {}
+            started = time.perf_counter()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                response.read()
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                results.append((time.perf_counter() - started, None, False))
+                continue
+            results.append((time.perf_counter() - started, _sql_queries(response),
+                            response.status < 400))
+    finally:
+        conn.close()
+
+
+def _run(port, factory, seed, total, concurrency):
+    """Spread ``total`` requests over ``concurrency`` threads; returns the
+    per-request results and the wall time"""
+    results = []
+    counts = [total // concurrency + (1 if i < total % concurrency else 0)
+              for i in range(concurrency)]
+    threads = [threading.Thread(target=_client, args=(port, factory, seed * 1000 + i, count, results))
+               for i, count in enumerate(counts) if count]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, time.perf_counter() - started
+
+
+def measure(port, pid, name, factory, args):
+    seed = args.seed * 100 + sum(map(ord, name))
+    _run(port, factory, seed + 1, args.warmup, args.concurrency)
+    rss_reset = _reset_peak_rss(pid)
+    results, wall = _run(port, factory, seed, args.requests, args.concurrency)
+    ms = [elapsed * 1000 for elapsed, _, ok in results if ok]
+    queries = [count for _, count, ok in results if ok and count is not None]
+    peak_rss = _peak_rss_kb(pid)
+    return {
+        'requests': len(results),
+        'errors': sum(1 for _, _, ok in results if not ok),
+        'throughput': round(len(ms) / wall, 1) if wall else 0.0,
+        'p50_ms': round(_percentile(ms, 50), 2),
+        'p95_ms': round(_percentile(ms, 95), 2),
+        'p99_ms': round(_percentile(ms, 99), 2),
+        'sql_queries': max(queries) if queries else None,
+        'peak_rss_mb': round(peak_rss / 1024, 1) if peak_rss else None,
+        'peak_rss_reset': rss_reset,
+    }
+
+
+def compare(results, baseline, tolerance, rss_tolerance):
+    """Return the regressions of ``results`` against ``baseline`` as messages"""
+    regressions = []
+    for name, base in baseline.get('endpoints', {}).items():
+        current = results.get(name)
+        if current is None:
+            continue
+        if (base.get('sql_queries') is not None and current['sql_queries'] is not None
+                and current['sql_queries'] > base['sql_queries']):
+            regressions.append(f"{name}: {current['sql_queries']} SQL statements per request "
+                               f"(baseline {base['sql_queries']})")
+        limit = max(base['p95_ms'] * (1 + tolerance), base['p95_ms'] + LATENCY_SLACK_MS)
+        if current['p95_ms'] > limit:
+            regressions.append(f"{name}: p95 {current['p95_ms']:.1f} ms "
+                               f"(baseline {base['p95_ms']:.1f} ms)")
+        if current['throughput'] < base['throughput'] * (1 - tolerance):
+            regressions.append(f"{name}: {current['throughput']:.1f} req/s "
+                               f"(baseline {base['throughput']:.1f} req/s)")
+        if (base.get('peak_rss_mb') and current['peak_rss_mb']
+                and current['peak_rss_mb'] > base['peak_rss_mb'] * (1 + rss_tolerance)):
+            regressions.append(f"{name}: peak RSS {current['peak_rss_mb']:.1f} MB "
+                               f"(baseline {base['peak_rss_mb']:.1f} MB)")
+    return regressions
+
+
+def _wait_for_server(port, server):
+    for _ in range(150):
+        if server.poll() is not None:
+            sys.exit('the app server exited during start-up')
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', '/issues?limit=100&fields=id,assignee_id')
+            body = json.loads(conn.getresponse().read())
+            conn.close()
+            return body
+        except (http.client.HTTPException, OSError):
+            time.sleep(0.2)
+    sys.exit('the app server did not start')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--issues', type=int, default=10000,
+                        help='synthetic issues in the database (flask generate-data)')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the data and the requests')
+    parser.add_argument('--requests', type=int, default=300, help='measured requests per endpoint')
+    parser.add_argument('--warmup', type=int, default=20, help='unmeasured requests per endpoint')
+    parser.add_argument('--concurrency', type=int, default=4, help='client threads')
+    parser.add_argument('--llm-latency', type=float, default=0.05,
+                        help='seconds the stub OpenAI server takes per completion')
+    parser.add_argument('--only', action='append', metavar='ENDPOINT',
+                        help='run only the endpoints whose name contains this (repeatable)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='write the results to --baseline instead of comparing')
+    parser.add_argument('--tolerance', type=float, default=0.3,
+                        help='allowed relative p95/throughput regression')
+    parser.add_argument('--rss-tolerance', type=float, default=0.15,
+                        help='allowed relative peak RSS regression')
+    parser.add_argument('--serve', type=int, metavar='PORT', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve)
+        return
+
+    workdir = tempfile.mkdtemp(prefix='endpoints-')
+    port = _free_port()
+    with StubOpenAIServer(latency=args.llm_latency, reply='stub-llm-answer') as stub:
+        env = dict(
+            os.environ,
+            DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+            OPENAI_API_KEY='stub-key',
+            OPENAI_BASE_URL=stub.base_url,
+            RESPONSE_CACHE_SIZE='0',
+            LLM_CACHE_SIZE='0',
+            METRICS_ENABLED='true',
+        )
+        for name in ('SQL_DEBUG', 'NPLUSONE_RAISE', 'LLM_CACHE_PATH'):
+            env.pop(name, None)
+        init_database(env, issues=args.issues, seed=args.seed)
+
+        server = subprocess.Popen([sys.executable, '-m', 'benchmarks.endpoints', '--serve', str(port)],
+                                  cwd=BASE_DIR, env=env, stderr=subprocess.DEVNULL)
+        try:
+            sample = _wait_for_server(port, server)
+            issue_ids = [issue['id'] for issue in sample]
+            assignee_id = next(issue['assignee_id'] for issue in sample if issue['assignee_id'])
+            endpoints = [(name, factory) for name, factory in _endpoints(issue_ids, assignee_id)
+                         if not args.only or any(part in name for part in args.only)]
+
+            print(f"{args.issues} issues, {args.requests} requests per endpoint, "
+                  f"{args.concurrency} clients, LLM latency {args.llm_latency}s")
+            print(f"{'endpoint':<26} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} "
+                  f"{'SQL':>4} {'RSS MB':>7} {'errors':>6}")
+            results = {}
+            for name, factory in endpoints:
+                result = results[name] = measure(port, server.pid, name, factory, args)
+                print(f"{name:<26} {result['throughput']:8.1f} {result['p50_ms']:8.1f} "
+                      f"{result['p95_ms']:8.1f} {result['p99_ms']:8.1f} "
+                      f"{result['sql_queries'] if result['sql_queries'] is not None else '-':>4} "
+                      f"{result['peak_rss_mb'] or float('nan'):7.1f} {result['errors']:>6}")
+        finally:
+            server.terminate()
+            server.wait()
+
+    config = {'issues': args.issues, 'seed': args.seed, 'requests': args.requests,
+              'concurrency': args.concurrency, 'llm_latency': args.llm_latency}
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump({'config': config, 'machine': f'{platform.machine()} {os.cpu_count()} CPUs, '
+                                                    f'Python {platform.python_version()}',
+                       'endpoints': results}, f, indent=2)
+            f.write('\n')
+        print(f"Baseline written to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get('config') != config:
+            print(f"Note: {args.baseline} was recorded with {baseline.get('config')}")
+        regressions = compare(results, baseline, args.tolerance, args.rss_tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.baseline}")
+    else:
+        print(f"No baseline at {args.baseline}; record one with --update-baseline")
+
+    if any(result['errors'] for result in results.values()):
+        sys.exit(2)
+
+
+if __name__ == '__main__':
+    main()
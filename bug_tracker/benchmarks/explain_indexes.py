@@ -0,0 +1,156 @@
+"""
+Before/after benchmark for the hot-filter indexes (schema version 2).
+
+Builds a database with the pre-index schema, fills it with synthetic issues
+from synthetic.py, then prints the query plan and median latency of each hot
+query before and after running migrations.upgrade().
+
+Usage (from the bug_tracker folder):
+    python -m benchmarks.explain_indexes --issues 200000
+    DATABASE_URL=postgresql://... python -m benchmarks.explain_indexes
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import synthetic  # noqa: E402
+
+
+def build_app(database_url):
+    os.environ['DATABASE_URL'] = database_url
+    from flask import Flask
+    from config import Config
+    from extensions import db
+
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+    db.init_app(app)
+    return app
+
+
+def create_legacy_schema(conn, users, issues):
+    """Create the tables as db.create_all() did before any indexes existed"""
+    from extensions import db
+    from models import Issue, User
+
+    db.metadata.drop_all(conn)
+    conn.exec_driver_sql('DROP TABLE IF EXISTS schema_version')
+    db.metadata.create_all(conn)
+    for index in list(Issue.__table__.indexes) + list(User.__table__.indexes):
+        index.drop(conn)
+
+    conn.execute(User.__table__.insert(), [
+        {'id': i, **row} for i, row in enumerate(synthetic.user_rows(users, seed=42), 1)
+    ])
+    for batch in synthetic.issue_batches(issues, list(range(1, users + 1)), seed=42, batch_size=10000):
+        conn.execute(Issue.__table__.insert(), batch)
+
+
+def hot_queries():
+    """Statements mirroring get_issues and the chatbot IssueQueryService"""
+    from sqlalchemy import select
+    from models import Issue, User
+    import search
+
+    now = datetime.utcnow()
+    newest = (Issue.created_at.desc(), Issue.id.desc())
+    return {
+        'list first page': select(Issue).order_by(*newest).limit(100),
+        'list status=Open': select(Issue).where(Issue.status == 'Open').order_by(*newest).limit(100),
+        'list assignee_id=3': select(Issue).where(Issue.assignee_id == 3).order_by(*newest).limit(100),
+        # ?title= filter: FTS5 trigram LIKE on SQLite, pg_trgm ILIKE on PostgreSQL
+        'list title~#12345': select(Issue).where(search.title_filter('#12345')).order_by(*newest).limit(100),
+        'chat priority issues': select(Issue).where(
+            Issue.priority.in_(['High', 'Medium']), Issue.status != 'Closed'
+        ).order_by(Issue.priority.desc(), Issue.created_at.desc()).limit(10),
+        'chat active issues': select(Issue).where(
+            Issue.status != 'Closed'
+        ).order_by(Issue.priority.desc(), Issue.created_at.desc()).limit(10),
+        'chat status In-Progress': select(Issue).where(
+            Issue.status == 'In-Progress'
+        ).order_by(Issue.created_at.desc()).limit(100),
+        'calendar week': select(Issue).where(
+            Issue.due_date >= now, Issue.due_date < now + timedelta(days=7)
+        ),
+        'user by name': select(User).where(User.name == synthetic.user_rows(42)[-1]['name']),
+    }
+
+
+def explain(conn, statement):
+    sql = str(statement.compile(conn, compile_kwargs={'literal_binds': True}))
+    prefix = 'EXPLAIN QUERY PLAN ' if conn.dialect.name == 'sqlite' else 'EXPLAIN '
+    rows = conn.exec_driver_sql(prefix + sql).fetchall()
+    return [str(row[-1]) for row in rows]
+
+
+def measure(conn, statement, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(statement).fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def run(conn, repeat):
+    results = {}
+    for name, statement in hot_queries().items():
+        results[name] = (measure(conn, statement, repeat), explain(conn, statement))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--issues', type=int, default=200000)
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    tmp_path = None
+    database_url = os.environ.get('DATABASE_URL')
+    if not database_url:
+        tmp_path = tempfile.mktemp(suffix='.db')
+        database_url = f'sqlite:///{tmp_path}'
+
+    app = build_app(database_url)
+    from extensions import db
+    from migrations import upgrade
+    import search
+
+    with app.app_context():
+        with db.engine.begin() as conn:
+            create_legacy_schema(conn, args.users, args.issues)
+        with db.engine.connect() as conn:
+            before = run(conn, args.repeat)
+        upgrade()
+        # Measure on fresh connections: the pooled SQLite connection of the
+        # first pass kept planning against the pre-index schema
+        db.engine.dispose()
+        search._backends.clear()  # detected before the search table existed
+        with db.engine.connect() as conn:
+            after = run(conn, args.repeat)
+        db.engine.dispose()
+
+    print(f"{args.issues} issues, {args.users} users, median of {args.repeat} runs\n")
+    print(f"{'query':<26}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+    for name in before:
+        b, a = before[name][0], after[name][0]
+        print(f"{name:<26}{b:>12.2f}{a:>12.2f}{b / a if a else 0:>9.1f}x")
+    for name in before:
+        print(f"\n== {name}")
+        print('  before: ' + ' / '.join(before[name][1]))
+        print('  after:  ' + ' / '.join(after[name][1]))
+
+    if tmp_path and os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,23 @@
+"""
+Database fixture shared by the benchmarks that run the app in subprocesses.
+"""
+import os
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def init_database(env, issues=0, users=100, seed=0, search_index=True):
+    """Create the schema and sample data for ``env``'s DATABASE_URL, then add
+    ``issues`` synthetic issues over ``users`` new users (flask generate-data).
+    Pass ``search_index=False`` when the benchmark never searches: building
+    the index dominates the load time."""
+    flask = [sys.executable, '-m', 'flask', '--app', 'app']
+    subprocess.run(flask + ['init-db'], cwd=BASE_DIR, env=env, check=True,
+                   stdout=subprocess.DEVNULL)
+    if issues:
+        subprocess.run(flask + ['generate-data', '--users', str(users), '--issues', str(issues),
+                                '--seed', str(seed),
+                                '--search-index' if search_index else '--no-search-index'],
+                       cwd=BASE_DIR, env=env, check=True, stdout=subprocess.DEVNULL)
@@ -0,0 +1,120 @@
+"""
+Micro-benchmark for MessageParser.parse.
+
+Compares the precompiled parser with the previous implementation, which
+lowercased the message once per intent and ran re.search over every pattern
+string on each call. On every message of the corpus both must return the
+same values for the keys the previous parser had.
+
+Usage (from the bug_tracker folder):
+    python -m benchmarks.intent_parser --rounds 2000
+"""
+import argparse
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from routes.chatbot import (  # noqa: E402
+    ASSIGNEE_PATTERNS, COMMON_WORDS, PRIORITY_PATTERNS, SEARCH_PATTERNS,
+    STATUS_PATTERNS, TASK_SUGGESTION_PATTERNS, MessageParser,
+)
+
+# Messages in the shape the chat UI actually receives
+CORPUS = [
+    "what is alex working on",
+    "What are Maddy and John doing this week?",
+    "Show me issues for Sarah",
+    "emily's tasks",
+    "who is john",
+    "suggest a task to work on",
+    "What should I work on next?",
+    "give me one task suggestion",
+    "recommend a task",
+    "top priority tasks",
+    "what are the most important issues right now",
+    "urgent issues for the release",
+    "show me open issues",
+    "closed tasks from last sprint",
+    "show me all in-progress",
+    "find issues about login",
+    "search for payment integration",
+    "look for anything related to the dashboard",
+    "hello",
+    "Can you give me an overview of everything that is currently happening on the project?",
+]
+
+
+def legacy_parse(message):
+    """MessageParser.parse as it was before the patterns were precompiled"""
+    def extract_assignee(message):
+        message_lower = message.lower()
+        for pattern in ASSIGNEE_PATTERNS:
+            match = re.search(pattern, message_lower)
+            if match:
+                potential_name = match.group(1).capitalize()
+                if potential_name.lower() not in COMMON_WORDS:
+                    return potential_name
+        return None
+
+    def extract_status(message):
+        message_lower = message.lower()
+        for pattern in STATUS_PATTERNS:
+            if re.search(pattern, message_lower):
+                if 'open' in message_lower:
+                    return 'Open'
+                elif 'in-progress' in message_lower or 'in progress' in message_lower:
+                    return 'In-Progress'
+                elif 'closed' in message_lower:
+                    return 'Closed'
+        return None
+
+    def extract_search_term(message):
+        message_lower = message.lower()
+        for pattern in SEARCH_PATTERNS:
+            match = re.search(pattern, message_lower)
+            if match:
+                term = match.group(1).strip(' ?.!"\'')
+                if term:
+                    return term
+        return None
+
+    return {
+        'assignee_name': extract_assignee(message),
+        'is_priority_query': any(re.search(p, message.lower()) for p in PRIORITY_PATTERNS),
+        'is_task_suggestion': any(re.search(p, message.lower()) for p in TASK_SUGGESTION_PATTERNS),
+        'status': extract_status(message),
+        'search_term': extract_search_term(message),
+        'original_message': message
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    for message in CORPUS:
+        expected = legacy_parse(message)
+        actual = {key: value for key, value in MessageParser.parse(message).items() if key in expected}
+        if expected != actual:
+            sys.exit(f"Parse mismatch for {message!r}:\n  legacy: {expected}\n  new:    {actual}")
+
+    def run(parse):
+        return min(timeit.repeat(lambda: [parse(m) for m in CORPUS],
+                                 number=args.rounds, repeat=args.repeat))
+
+    messages = args.rounds * len(CORPUS)
+    legacy = run(legacy_parse)
+    current = run(MessageParser.parse)
+    print(f"{len(CORPUS)} messages x {args.rounds} rounds, best of {args.repeat}")
+    print(f"legacy:      {legacy / messages * 1e6:8.2f} us/message")
+    print(f"precompiled: {current / messages * 1e6:8.2f} us/message")
+    print(f"speedup:     {legacy / current:8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Issue list serialization: ORM to_dict() vs column rows, stdlib vs orjson.
+
+Loads --issues synthetic issues into a temporary SQLite database, then
+times building one payload of every issue, the median of --runs runs in a
+fresh session each:
+
+- build: the query plus the list of dicts, either ORM instances through
+  ``Issue.to_dict()`` or column tuples through serializers.py;
+- encode: ``app.json.response()`` of that list, with Flask's stdlib
+  provider and with json_provider.OrjsonProvider (when orjson is installed).
+
+Usage (from the bug_tracker folder):
+    python -m benchmarks.json_serialization
+    python -m benchmarks.json_serialization --issues 100000 --fields id,title,status
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import init_database  # noqa: E402
+
+
+def _median_ms(runs, func):
+    timings = []
+    result = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--issues', type=int, default=10000,
+                        help='synthetic issues in the database (flask generate-data)')
+    parser.add_argument('--runs', type=int, default=7)
+    parser.add_argument('--fields', help='comma separated fields, as in GET /issues?fields=')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='json-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ.pop('SQL_DEBUG', None)
+    init_database(dict(os.environ), issues=args.issues, search_index=False)
+
+    from flask.json.provider import DefaultJSONProvider
+    from app import app
+    from extensions import db
+    from models import Issue
+    from routes.issues import column_options, parse_fields
+    import json_provider
+    from serializers import issue_serializer
+
+    fields = parse_fields(args.fields)
+    providers = {'stdlib': DefaultJSONProvider(app)}
+    if json_provider.orjson is not None:
+        providers['orjson'] = json_provider.OrjsonProvider(app)
+
+    def orm_dicts():
+        db.session.remove()
+        return [issue.to_dict(fields) for issue in Issue.query.options(*column_options(fields))]
+
+    def row_dicts():
+        db.session.remove()
+        serializer = issue_serializer(fields)
+        return serializer.dicts(serializer.select(Issue.query))
+
+    with app.app_context():
+        total = Issue.query.count()
+        print(f"{total} issues, fields: {', '.join(fields) if fields else 'all'}; "
+              f"median of {args.runs} runs")
+        builds = {}
+        for name, build in (('ORM to_dict', orm_dicts), ('column rows', row_dicts)):
+            elapsed, payload = _median_ms(args.runs, build)
+            builds[name] = payload
+            print(f"  build  {name:<12} {elapsed:8.1f} ms")
+        assert builds['ORM to_dict'] == builds['column rows'], 'the serializers disagree'
+
+        payload = builds['column rows']
+        bodies = {}
+        for name, provider in providers.items():
+            elapsed, response = _median_ms(args.runs, lambda: provider.response(payload))
+            bodies[name] = response.get_data()
+            print(f"  encode {name:<12} {elapsed:8.1f} ms  ({len(bodies[name]) / 1024:.0f} KiB)")
+        if len(bodies) > 1:
+            same = providers['stdlib'].loads(bodies['stdlib']) == providers['stdlib'].loads(bodies['orjson'])
+            print(f"  orjson and stdlib bodies decode to the same data: {'yes' if same else 'NO'}")
+
+
+if __name__ == '__main__':
+    main()
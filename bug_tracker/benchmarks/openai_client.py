@@ -0,0 +1,64 @@
+"""
+Benchmark for the shared OpenAI client.
+
+Sends the same chat completion to a local stub server (benchmarks/stub_openai.py)
+first with a new client per request, as the chatbot used to, then through
+ChatbotService.get_openai_client(). Reports per-request latency and how many
+TCP connections each approach opened.
+
+Usage (from the bug_tracker folder):
+    python -m benchmarks.openai_client --requests 200
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_openai import StubOpenAIServer  # noqa: E402
+
+MESSAGES = [{'role': 'user', 'content': 'What is alex working on?'}]
+
+
+def run(server, get_client, requests):
+    server.reset_counters()
+    started = time.perf_counter()
+    for _ in range(requests):
+        client = get_client()
+        client.chat.completions.create(model='gpt-3.5-turbo', messages=MESSAGES, max_tokens=50)
+    elapsed = time.perf_counter() - started
+    return elapsed / requests * 1000, server.connections
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='artificial server latency in seconds')
+    args = parser.parse_args()
+
+    with StubOpenAIServer(latency=args.latency) as server:
+        os.environ['OPENAI_API_KEY'] = 'stub-key'
+        os.environ['OPENAI_BASE_URL'] = server.base_url
+
+        from openai import OpenAI
+        from routes.chatbot import ChatbotService
+
+        def per_request_client():
+            return OpenAI(api_key='stub-key', base_url=server.base_url)
+
+        # Warm up imports and the shared pool
+        run(server, ChatbotService.get_openai_client, 5)
+
+        fresh_ms, fresh_conns = run(server, per_request_client, args.requests)
+        shared_ms, shared_conns = run(server, ChatbotService.get_openai_client, args.requests)
+
+    print(f"{args.requests} requests against {server.base_url}")
+    print(f"client per request: {fresh_ms:8.2f} ms/request, {fresh_conns} connections")
+    print(f"shared client:      {shared_ms:8.2f} ms/request, {shared_conns} connections")
+    print(f"speedup:            {fresh_ms / shared_ms:8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
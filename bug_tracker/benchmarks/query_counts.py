@@ -0,0 +1,92 @@
+"""
+Check that the read endpoints run a constant number of SQL statements.
+
+Creates the app on a temporary SQLite database with the seed data, then for
+each route counts the statements of one request, adds synthetic users and
+issues (synthetic.py), and counts again (query_debug.assert_constant_queries).
+Exits with status 1 if any route's query count grows with the data, which
+signals an N+1.
+
+Usage (from the bug_tracker folder):
+    python -m benchmarks.query_counts --issues 300
+"""
+import argparse
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ROUTES = [
+    ('GET', '/issues'),
+    ('GET', '/issues?sort=priority&limit=200'),
+    ('GET', '/issues?status=Open&assignee=alex'),
+    ('GET', '/issues/search?q=login'),
+    ('GET', '/issues/next?limit=20'),
+    ('GET', '/issues/calendar?start={today}&end={next_week}'),
+    ('GET', '/issues/export?format=ndjson'),
+    ('GET', '/users'),
+    ('POST', '/chat', {'message': 'what is alex working on'}),
+    ('POST', '/chat', {'message': 'show me open issues'}),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--issues', type=int, default=300)
+    parser.add_argument('--users', type=int, default=30)
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = f"sqlite:///{tempfile.mktemp(suffix='.db')}"
+    os.environ.pop('OPENAI_API_KEY', None)  # chat answers without the LLM
+    from app import app
+    from extensions import db
+    from models import Issue, User
+    from query_debug import NPlusOneError, assert_constant_queries
+    import synthetic
+
+    app.test_cli_runner().invoke(args=['init-db'])
+    client = app.test_client()
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    def grow_data():
+        with app.app_context():
+            synthetic.generate(args.users, args.issues, days=30)
+
+    with app.app_context():
+        seeded_issues = db.session.query(db.func.max(Issue.id)).scalar()
+        seeded_users = db.session.query(db.func.max(User.id)).scalar()
+
+    def reset_data():
+        # Back to the seed data, so /issues/export stays within one
+        # EXPORT_BATCH_SIZE batch (it legitimately runs a query per batch)
+        with app.app_context():
+            db.session.execute(db.delete(Issue).where(Issue.id > seeded_issues))
+            db.session.execute(db.delete(User).where(User.id > seeded_users))
+            db.session.commit()
+
+    failures = 0
+    for method, url, *body in ROUTES:
+        url = url.format(today=today.strftime('%Y-%m-%d'),
+                         next_week=(today + timedelta(days=7)).strftime('%Y-%m-%d'))
+        label = f'{method} {url}' + (f" {body[0]['message']!r}" if body else '')
+
+        def send_request():
+            response = client.open(url, method=method, json=body[0] if body else None)
+            response.get_data()  # drain streamed responses
+            assert response.status_code == 200, (label, response.status_code)
+
+        try:
+            before, after = assert_constant_queries(send_request, grow_data, label)
+            print(f"ok    {before:3d} -> {after:3d}  {label}")
+        except NPlusOneError as e:
+            failures += 1
+            print(f"FAIL  {e}")
+        reset_data()
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""
+Concurrent write benchmark for the SQLite engine tuning (database.py).
+
+Runs --processes worker processes (like gunicorn workers) with --threads
+threads each against one SQLite file. Every thread loops over the issue
+endpoints through the Flask test client: PATCH /issues/<id>/status with
+probability --write-ratio, GET /issues?limit=50 otherwise. This is done
+twice, on a fresh database each time:
+
+- untuned: rollback journal, synchronous=FULL, no mmap (the SQLite defaults)
+- tuned:   the defaults from config.py (WAL, synchronous=NORMAL, mmap)
+
+and reports throughput, write latency and failed requests, which are the
+"database is locked" errors.
+
+Usage (from the bug_tracker folder):
+    python -m benchmarks.sqlite_writes
+    python -m benchmarks.sqlite_writes --processes 4 --threads 8 --write-ratio 0.5
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import init_database  # noqa: E402
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODES = {
+    'untuned': {
+        'SQLITE_JOURNAL_MODE': 'DELETE',
+        'SQLITE_SYNCHRONOUS': 'FULL',
+        'SQLITE_MMAP_SIZE': '0',
+    },
+    'tuned': {},
+}
+
+
+def _percentile(values, pct):
+    if not values:
+        return float('nan')
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run_worker(args):
+    """One worker process: hammer the endpoints, print the results as JSON"""
+    from app import app
+    from models import Issue
+
+    with app.app_context():
+        issue_ids = [issue_id for (issue_id,) in Issue.query.with_entities(Issue.id)]
+
+    results = {'reads': 0, 'writes': 0, 'write_latencies': [], 'failed': 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.duration
+
+    def client_loop(seed):
+        rng = random.Random(seed)
+        client = app.test_client()
+        while time.perf_counter() < deadline:
+            write = rng.random() < args.write_ratio
+            started = time.perf_counter()
+            if write:
+                response = client.patch(f'/issues/{rng.choice(issue_ids)}/status',
+                                        json={'status': rng.choice(['Open', 'In-Progress'])})
+            else:
+                response = client.get('/issues?limit=50')
+            elapsed = time.perf_counter() - started
+            with lock:
+                if response.status_code >= 500:
+                    results['failed'] += 1
+                elif write:
+                    results['writes'] += 1
+                    results['write_latencies'].append(elapsed)
+                else:
+                    results['reads'] += 1
+
+    threads = [threading.Thread(target=client_loop, args=(os.getpid() * 100 + i,))
+               for i in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(json.dumps(results))
+
+
+def run_mode(name, overrides, args):
+    workdir = tempfile.mkdtemp(prefix='sqlite-writes-')
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        RESPONSE_CACHE_SIZE='0',
+        SQLITE_BUSY_TIMEOUT_MS=str(args.busy_timeout_ms),
+        **overrides,
+    )
+    env.pop('SQL_DEBUG', None)
+    # Create and fill the database once, before the workers start
+    init_database(env, issues=args.issues, search_index=False)
+
+    command = [sys.executable, '-m', 'benchmarks.sqlite_writes', '--worker',
+               '--threads', str(args.threads), '--duration', str(args.duration),
+               '--write-ratio', str(args.write_ratio)]
+    workers = [subprocess.Popen(command, cwd=BASE_DIR, env=env, stdout=subprocess.PIPE,
+                                stderr=subprocess.DEVNULL, text=True)
+               for _ in range(args.processes)]
+    totals = {'reads': 0, 'writes': 0, 'write_latencies': [], 'failed': 0}
+    for worker in workers:
+        output, _ = worker.communicate()
+        result = json.loads(output.strip().splitlines()[-1])
+        for key in totals:
+            totals[key] += result[key]
+
+    ms = [value * 1000 for value in totals['write_latencies']]
+    print(f"{name:<8} reads {totals['reads'] / args.duration:7.1f}/s  "
+          f"writes {totals['writes'] / args.duration:6.1f}/s  "
+          f"write p50 {_percentile(ms, 50):6.1f} ms  p99 {_percentile(ms, 99):7.1f} ms  "
+          f"failed {totals['failed']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--issues', type=int, default=10000,
+                        help='synthetic issues in the database (flask generate-data)')
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    parser.add_argument('--busy-timeout-ms', type=int, default=5000,
+                        help='SQLITE_BUSY_TIMEOUT_MS for both runs')
+    parser.add_argument('--mode', choices=list(MODES), help='run only this configuration')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args)
+        return
+
+    print(f"{args.processes} processes x {args.threads} threads, "
+          f"{args.write_ratio:.0%} writes, {args.duration:g}s per run")
+    for name, overrides in MODES.items():
+        if args.mode in (None, name):
+            run_mode(name, overrides, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Startup time: from interpreter start to the first response.
+
+Each run is a fresh Python process (like a new gunicorn worker) on an
+already initialised database that imports ``app`` and serves GET /issues
+and GET / through the test client. The phases are reported as the median
+of --runs runs:
+
+- python:  interpreter start-up until the script runs
+- import:  ``import app``, i.e. create_app()
+- first:   the first GET /issues (first connection, first query)
+- index:   the first GET / (template compilation)
+
+``--with-init`` also runs ``flask init-db``'s work (migrations.upgrade() and
+the seed probe) inside every process, as create_app() used to.
+
+Usage (from the bug_tracker folder):
+    python -m benchmarks.startup_time
+    python -m benchmarks.startup_time --with-init
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import init_database  # noqa: E402
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = r'''
+import json, sys, time
+started = time.perf_counter()
+import app as app_module
+app = app_module.app
+imported = time.perf_counter()
+if {with_init}:
+    with app.app_context():
+        from migrations import upgrade
+        from seed import seed_data
+        upgrade()
+        seed_data()
+initialised = time.perf_counter()
+client = app.test_client()
+assert client.get('/issues').status_code == 200
+first = time.perf_counter()
+assert client.get('/').status_code == 200
+index = time.perf_counter()
+print(json.dumps({{
+    'import': imported - started, 'init': initialised - imported,
+    'first': first - initialised, 'index': index - first,
+    'openai_loaded': 'openai' in sys.modules,
+}}))
+'''
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=7)
+    parser.add_argument('--issues', type=int, default=10000,
+                        help='synthetic issues in the database (flask generate-data)')
+    parser.add_argument('--with-init', action='store_true',
+                        help='migrate and probe the seed data in every process (the old startup path)')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='startup-')
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+    env.pop('SQL_DEBUG', None)
+    init_database(env, issues=args.issues, search_index=False)
+
+    probe = PROBE.format(with_init=args.with_init)
+    phases = {'python': [], 'import': [], 'init': [], 'first': [], 'index': [], 'total': []}
+    openai_loaded = False
+    for _ in range(args.runs):
+        launched = time.perf_counter()
+        output = subprocess.run([sys.executable, '-c', probe], cwd=BASE_DIR, env=env, check=True,
+                                capture_output=True, text=True).stdout
+        total = time.perf_counter() - launched
+        result = json.loads(output.strip().splitlines()[-1])
+        openai_loaded |= result.pop('openai_loaded')
+        for name, value in result.items():
+            phases[name].append(value)
+        phases['total'].append(total)
+        phases['python'].append(total - sum(result.values()))
+
+    shown = [name for name in phases if name != 'init' or args.with_init]
+    print(f"median of {args.runs} runs" + (" (with init)" if args.with_init else ""))
+    for name in shown:
+        print(f"  {name:<7} {statistics.median(phases[name]) * 1000:7.1f} ms")
+    print(f"  openai imported before the first chat: {'yes' if openai_loaded else 'no'}")
+
+
+if __name__ == '__main__':
+    main()
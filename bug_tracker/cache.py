@@ -0,0 +1,168 @@
+"""
+Conditional GET and response caching for the read endpoints.
+
+Every committed write to a tracked table bumps that table's row in
+``data_version`` inside the same transaction (session events below catch
+ORM flushes as well as bulk insert/update/delete statements). Read endpoints
+decorated with ``@cached_response`` then:
+
+- derive an ETag from the versions of the tables they read, answering a
+  matching ``If-None-Match`` with 304 and no body;
+- keep serialized bodies in an in-process LRU keyed by URL and those
+  versions, so any write makes older entries unreachable and a cache hit
+  costs one primary-key lookup instead of a query plus serialization.
+
+Because the versions live in the database, workers never serve data older
+than the last commit, whichever process made it.
+"""
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import Response, current_app, g, has_app_context, request
+from sqlalchemy import event, select, update
+from extensions import db
+
+TRACKED_TABLES = ('issue', 'user')
+
+_DIRTY_KEY = 'dirty_tables'
+_VERSIONS_KEY = 'data_versions'
+
+
+class ResponseCache:
+    """Thread-safe LRU of serialized responses with a time-to-live"""
+
+    def __init__(self, max_size=512, ttl=30.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+response_cache = ResponseCache()
+
+
+def _mark(session, table_name):
+    if table_name in TRACKED_TABLES:
+        session.info.setdefault(_DIRTY_KEY, set()).add(table_name)
+
+
+def _after_flush(session, flush_context):
+    for instance in list(session.new) + list(session.dirty) + list(session.deleted):
+        _mark(session, getattr(instance, '__tablename__', None))
+
+
+def _do_orm_execute(state):
+    # Bulk statements such as insert(Issue) with a parameter list skip flush
+    if state.is_insert or state.is_update or state.is_delete:
+        _mark(state.session, state.statement.table.name)
+
+
+def _before_commit(session):
+    # Pending objects are only flushed after this hook, so check them here too
+    _after_flush(session, None)
+    dirty = session.info.pop(_DIRTY_KEY, None)
+    if dirty:
+        from models import DataVersion
+
+        if has_app_context():
+            g.pop(_VERSIONS_KEY, None)
+        session.execute(
+            update(DataVersion)
+            .where(DataVersion.name.in_(sorted(dirty)))
+            .values(version=DataVersion.version + 1)
+        )
+
+
+def _after_rollback(session):
+    session.info.pop(_DIRTY_KEY, None)
+
+
+def init_app(app):
+    """Configure the response cache and install the write-tracking events"""
+    response_cache.max_size = app.config.get('RESPONSE_CACHE_SIZE', 512)
+    response_cache.ttl = app.config.get('RESPONSE_CACHE_TTL', 30.0)
+    if not event.contains(db.session, 'before_commit', _before_commit):
+        event.listen(db.session, 'after_flush', _after_flush)
+        event.listen(db.session, 'do_orm_execute', _do_orm_execute)
+        event.listen(db.session, 'before_commit', _before_commit)
+        event.listen(db.session, 'after_rollback', _after_rollback)
+
+
+def current_versions(tables):
+    """Return {table: version} for the given tables.
+
+    Versions are read in one query and memoized for the rest of the request;
+    committing a write clears the memo.
+    """
+    from models import DataVersion
+
+    memo = g.setdefault(_VERSIONS_KEY, {}) if has_app_context() else {}
+    missing = [table for table in tables if table not in memo]
+    if missing:
+        rows = db.session.execute(
+            select(DataVersion.name, DataVersion.version).where(DataVersion.name.in_(missing))
+        )
+        versions = dict(rows.all())
+        memo.update({table: versions.get(table, 0) for table in missing})
+    return {table: memo[table] for table in tables}
+
+
+def cached_response(*tables):
+    """Serve a GET view with ETag revalidation and the in-process response cache.
+
+    ``tables`` lists every tracked table the view's output depends on.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            versions = current_versions(tables)
+            etag = '.'.join(f'{t}-{v}' for t, v in versions.items())
+            if etag in request.if_none_match:
+                response = Response(status=304)
+                response.set_etag(etag)
+                return response
+
+            key = (request.full_path, etag)
+            cached = response_cache.get(key)
+            if cached is not None:
+                body, status, headers = cached
+                response = Response(body, status=status, headers=headers)
+                response.headers['X-Cache'] = 'HIT'
+                return response
+
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                response.set_etag(etag)
+                response.headers['Cache-Control'] = 'no-cache'
+                headers = [(k, v) for k, v in response.headers.items() if k != 'Content-Length']
+                response_cache.set(key, (response.get_data(), response.status_code, headers))
+                response.headers['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
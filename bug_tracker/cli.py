@@ -0,0 +1,87 @@
+"""
+Database commands for the ``flask`` CLI.
+
+Schema changes and sample data are kept out of create_app() so importing the
+app (every gunicorn worker, on every boot) runs no DDL and no seed probe.
+Run them once per deploy instead:
+
+    flask --app app init-db    # create/migrate the schema, seed if empty
+    flask --app app migrate    # apply pending schema migrations only
+    flask --app app seed       # load the sample data into an empty database
+    flask --app app generate-data --users 1000 --issues 1000000
+                               # add synthetic data at production scale
+"""
+import click
+from flask.cli import with_appcontext
+
+
+@click.command('migrate')
+@with_appcontext
+def migrate_command():
+    """Apply pending schema migrations."""
+    from migrations import LATEST_VERSION, upgrade
+    version = upgrade()
+    click.echo(f"Schema at version {version} (latest {LATEST_VERSION}).")
+
+
+@click.command('seed')
+@with_appcontext
+def seed_command():
+    """Load the sample users and issues into an empty database."""
+    from models import User
+    from seed import seed_data
+    if User.query.first() is not None:
+        click.echo("Database already has data, not seeding.")
+        return
+    seed_data()
+    click.echo(f"Seeded {User.query.count()} users.")
+
+
+@click.command('init-db')
+@click.option('--seed/--no-seed', default=True, show_default=True,
+              help='Load the sample data when the database is empty.')
+@with_appcontext
+@click.pass_context
+def init_db_command(ctx, seed):
+    """Create or upgrade the schema, then seed an empty database."""
+    ctx.invoke(migrate_command)
+    if seed:
+        ctx.invoke(seed_command)
+
+
+@click.command('generate-data')
+@click.option('--users', default=200, show_default=True, help='Users to add (0: use the existing ones).')
+@click.option('--issues', default=100000, show_default=True, help='Issues to add.')
+@click.option('--seed', default=0, show_default=True, help='Random seed; the same seed gives the same rows.')
+@click.option('--batch-size', default=None, type=int, help='Rows per INSERT transaction.')
+@click.option('--search-index/--no-search-index', default=True, show_default=True,
+              help='Rebuild the title/description search index after a bulk load '
+                   '(the slowest step; without it searches fall back to ILIKE).')
+@with_appcontext
+@click.pass_context
+def generate_data_command(ctx, users, issues, seed, batch_size, search_index):
+    """Bulk-insert synthetic users and issues (see synthetic.py).
+
+    When --issues is larger than the issue table, the issue indexes and the
+    search index are dropped for the load and rebuilt at the end, so queries
+    are slow until it finishes. Do not run it against a live database. If the
+    process is killed mid-load, run it again (even with --users 0 --issues 0)
+    to re-create them.
+    """
+    import time
+    import synthetic
+    ctx.invoke(migrate_command)
+    started = time.perf_counter()
+    with click.progressbar(length=issues, label='Inserting issues') as bar:
+        result = synthetic.generate(
+            users, issues, seed=seed, batch_size=batch_size or synthetic.BATCH_SIZE,
+            progress=lambda done: bar.update(done - bar.pos), search_index=search_index,
+        )
+    click.echo(f"Added {result['users']} users and {result['issues']} issues "
+               f"in {time.perf_counter() - started:.1f}s ({result['total_issues']} issues in total).")
+
+
+def init_app(app):
+    """Register the database commands on ``app.cli``"""
+    for command in (init_db_command, migrate_command, seed_command, generate_data_command):
+        app.cli.add_command(command)
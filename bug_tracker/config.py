@@ -1,5 +1,43 @@
 import os
 
+
+def engine_options(database_uri):
+    """SQLAlchemy engine options for ``database_uri``, tunable through the environment.
+    
+    The pool is per worker process: WEB_CONCURRENCY x (DB_POOL_SIZE +
+    DB_MAX_OVERFLOW) must stay below the server's max_connections.
+    """
+    if database_uri.startswith('sqlite'):
+        if database_uri.rstrip('/') in ('sqlite:', 'sqlite:///:memory:'):
+            return {}  # in-memory databases use a single shared connection
+        # Local file: nothing to pre-ping or recycle; see database.py for the
+        # pragmas applied on connect
+        return {
+            'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+            'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 5)),
+        }
+    
+    options = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 5)),
+        'pool_timeout': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        # Test connections on checkout so ones dropped by the server or a
+        # proxy after a deploy or idle period are replaced transparently
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', 'true').lower() not in ('0', 'false', 'no'),
+        # Replace connections before idle-timeout proxies silently kill them
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+    }
+    if database_uri.startswith('postgresql'):
+        # Caps every statement, including the CLI's; migrations and the bulk
+        # index rebuild lift it for their transaction (see database.py)
+        statement_timeout = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 30000))
+        options['connect_args'] = {
+            'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', 10)),
+            'options': f'-c statement_timeout={statement_timeout}',
+        }
+    return options
+
+
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
     
@@ -11,5 +49,56 @@ class Config:
     
     SQLALCHEMY_DATABASE_URI = database_url or 'sqlite:///bug_tracker.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-
-
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+    
+    # Applied to every new SQLite connection (see database.py)
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    
+    # In-process cache of serialized GET responses (see cache.py)
+    RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', 512))
+    RESPONSE_CACHE_TTL = float(os.environ.get('RESPONSE_CACHE_TTL', 30))
+    
+    # OpenAI client used by the chatbot; one pooled client per worker process
+    OPENAI_BASE_URL = os.environ.get('OPENAI_BASE_URL')
+    OPENAI_TIMEOUT = float(os.environ.get('OPENAI_TIMEOUT', 30))
+    OPENAI_CONNECT_TIMEOUT = float(os.environ.get('OPENAI_CONNECT_TIMEOUT', 5))
+    OPENAI_MAX_RETRIES = int(os.environ.get('OPENAI_MAX_RETRIES', 2))
+    OPENAI_MAX_CONNECTIONS = int(os.environ.get('OPENAI_MAX_CONNECTIONS', 20))
+    OPENAI_MAX_KEEPALIVE = int(os.environ.get('OPENAI_MAX_KEEPALIVE', 10))
+    
+    # Chatbot LLM response cache (see llm_cache.py); set LLM_CACHE_PATH to a
+    # SQLite file to share it between workers
+    LLM_CACHE_SIZE = int(os.environ.get('LLM_CACHE_SIZE', 256))
+    LLM_CACHE_TTL = float(os.environ.get('LLM_CACHE_TTL', 300))
+    LLM_CACHE_PATH = os.environ.get('LLM_CACHE_PATH')
+    
+    # In-flight LLM calls per worker; keep below the gunicorn thread count so
+    # the issue endpoints keep free threads (see gunicorn.conf.py). A chat
+    # request that finds every slot busy for longer than the queue timeout
+    # (default: not at all) gets the non-LLM answer instead of a thread.
+    CHAT_MAX_LLM_CALLS = int(os.environ.get('CHAT_MAX_LLM_CALLS', 4))
+    CHAT_LLM_QUEUE_TIMEOUT = float(os.environ.get('CHAT_LLM_QUEUE_TIMEOUT', 0))
+    
+    # Issue context sent to the LLM (see llm_context.py): 'table' is the
+    # compact encoding, 'full' the original one-block-per-issue text
+    LLM_CONTEXT_TOKEN_BUDGET = int(os.environ.get('LLM_CONTEXT_TOKEN_BUDGET', 1500))
+    LLM_CONTEXT_DESCRIPTION_CHARS = int(os.environ.get('LLM_CONTEXT_DESCRIPTION_CHARS', 160))
+    LLM_CONTEXT_FORMAT = os.environ.get('LLM_CONTEXT_FORMAT', 'table')
+    
+    # Response encoder (see json_provider.py): auto, orjson or stdlib
+    JSON_PROVIDER = os.environ.get('JSON_PROVIDER', 'auto')
+    
+    # Request/SQL/OpenAI timing served on /metrics (see metrics.py)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+    
+    # Slow query log and N+1 detector (see query_debug.py); on by default in
+    # debug and testing mode, SQL_DEBUG=true/false forces it
+    SQL_DEBUG = (
+        os.environ['SQL_DEBUG'].lower() not in ('0', 'false', 'no')
+        if os.environ.get('SQL_DEBUG') else None
+    )
+    SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 100))
+    NPLUSONE_THRESHOLD = int(os.environ.get('NPLUSONE_THRESHOLD', 5))
@@ -0,0 +1,69 @@
+"""
+Database engine tuning.
+
+Pool options come from ``SQLALCHEMY_ENGINE_OPTIONS`` (built per database in
+config.py). SQLite has no server settings, so its tuning is applied to every
+new connection by a ``connect`` hook:
+
+- ``journal_mode=WAL``: readers no longer block the writer and the writer no
+  longer blocks readers, so concurrent requests stop failing with
+  "database is locked".
+- ``synchronous=NORMAL``: safe with WAL (a power cut can lose the last
+  commits but never corrupts the file) and saves an fsync per commit.
+- ``mmap_size``: reads are served from the page cache without a copy.
+- ``busy_timeout``: a writer waits for the lock instead of failing at once.
+"""
+import logging
+from sqlalchemy import event, text
+from extensions import db
+
+logger = logging.getLogger(__name__)
+
+SQLITE_JOURNAL_MODES = ('DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF')
+SQLITE_SYNCHRONOUS = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+
+
+def sqlite_pragmas(config):
+    """PRAGMA statements for new SQLite connections from the app config"""
+    journal_mode = str(config.get('SQLITE_JOURNAL_MODE', 'WAL')).upper()
+    synchronous = str(config.get('SQLITE_SYNCHRONOUS', 'NORMAL')).upper()
+    if journal_mode not in SQLITE_JOURNAL_MODES:
+        raise ValueError(f"SQLITE_JOURNAL_MODE must be one of: {', '.join(SQLITE_JOURNAL_MODES)}")
+    if synchronous not in SQLITE_SYNCHRONOUS:
+        raise ValueError(f"SQLITE_SYNCHRONOUS must be one of: {', '.join(SQLITE_SYNCHRONOUS)}")
+    return [
+        f"PRAGMA journal_mode={journal_mode}",
+        f"PRAGMA synchronous={synchronous}",
+        f"PRAGMA mmap_size={int(config.get('SQLITE_MMAP_SIZE', 0))}",
+        f"PRAGMA busy_timeout={int(config.get('SQLITE_BUSY_TIMEOUT_MS', 5000))}",
+    ]
+
+
+def disable_statement_timeout(conn):
+    """Lift the PostgreSQL statement_timeout (see config.py) for the rest of
+    the current transaction, for schema changes and index builds that can
+    legitimately run longer than any request"""
+    if conn.dialect.name == 'postgresql':
+        conn.execute(text('SET LOCAL statement_timeout = 0'))
+
+
+def _apply_pragmas(pragmas):
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+    return on_connect
+
+
+def init_app(app):
+    """Install the SQLite connect hook on the app's engines"""
+    pragmas = sqlite_pragmas(app.config)
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name != 'sqlite' or engine.url.database in (None, '', ':memory:'):
+                continue
+            event.listen(engine, 'connect', _apply_pragmas(pragmas))
+            logger.debug(f"SQLite tuning for {engine.url.database}: {'; '.join(pragmas)}")
@@ -0,0 +1,21 @@
+"""
+Gunicorn settings, loaded with ``gunicorn -c gunicorn.conf.py app:app``.
+
+Workers are threaded: a chat request waiting on the OpenAI API holds one
+thread rather than a whole worker process. The chatbot also limits its own
+in-flight LLM calls per worker (CHAT_MAX_LLM_CALLS, default 4), below the
+thread count, so the issue endpoints are never starved by slow completions.
+"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+# Long enough for a completion including the client's retries
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+keepalive = 5
+# Import the app once in the master and fork the workers from it: create_app()
+# opens no database connections (the schema is managed by `flask init-db`),
+# so nothing is shared between processes, and new workers start at once
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() not in ('0', 'false', 'no')
@@ -0,0 +1,150 @@
+"""
+Cache of chatbot LLM responses.
+
+A completion is reused when the same question meets the same data: the key is
+the normalized intent of the message (for example ``('assignee', 'work',
+'alex')``; the message text itself when no pattern matches), a hash of the
+issue context sent to the model and a hash of the system prompt and model.
+Any write that changes the relevant issues changes the context hash, so
+stale answers are never looked up again and simply age out.
+
+Entries live in an in-process LRU by default. Setting ``LLM_CACHE_PATH``
+stores them in a SQLite file instead, so every gunicorn worker on the host
+shares them. Hit and miss counters are kept per process (see ``stats()``).
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+from cache import ResponseCache
+
+logger = logging.getLogger(__name__)
+
+
+def _digest(*parts: str) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode('utf-8'))
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+def make_key(intent, issues_text: str, system_prompt: str, model: str) -> str:
+    """Cache key for a completion; ``intent`` must be JSON serializable"""
+    return _digest(json.dumps(intent), issues_text, system_prompt, model)
+
+
+class SQLiteResponseStore:
+    """LRU + TTL key/value store in a SQLite file shared between processes"""
+
+    def __init__(self, path, max_size=256, ttl=300.0):
+        self.path = path
+        self.max_size = max_size
+        self.ttl = ttl
+        self._local = threading.local()
+
+    def _connection(self):
+        # One connection per thread, re-opened in forked workers
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS llm_response (key TEXT PRIMARY KEY, '
+                'value TEXT NOT NULL, expires_at REAL NOT NULL, used_at REAL NOT NULL)'
+            )
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def get(self, key):
+        conn = self._connection()
+        now = time.time()
+        row = conn.execute(
+            'SELECT value FROM llm_response WHERE key = ? AND expires_at > ?', (key, now)
+        ).fetchone()
+        if row is None:
+            return None
+        conn.execute('UPDATE llm_response SET used_at = ? WHERE key = ?', (now, key))
+        return row[0]
+
+    def set(self, key, value):
+        if self.max_size <= 0:
+            return
+        conn = self._connection()
+        now = time.time()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute(
+                'INSERT OR REPLACE INTO llm_response (key, value, expires_at, used_at) '
+                'VALUES (?, ?, ?, ?)', (key, value, now + self.ttl, now)
+            )
+            conn.execute('DELETE FROM llm_response WHERE expires_at <= ?', (now,))
+            conn.execute(
+                'DELETE FROM llm_response WHERE key IN (SELECT key FROM llm_response '
+                'ORDER BY used_at DESC LIMIT -1 OFFSET ?)', (self.max_size,)
+            )
+
+    def clear(self):
+        self._connection().execute('DELETE FROM llm_response')
+
+
+class LLMResponseCache:
+    """Response cache with hit/miss counters in front of a store"""
+
+    def __init__(self, store=None):
+        self.store = store or ResponseCache(max_size=256, ttl=300.0)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            value = self.store.get(key)
+        except sqlite3.Error as e:
+            # A broken shared cache must never break the chat itself
+            logger.warning(f"LLM cache read failed: {e}")
+            self._count('errors')
+            value = None
+        self._count('misses' if value is None else 'hits')
+        return value
+
+    def set(self, key: str, value: str):
+        try:
+            self.store.set(key, value)
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache write failed: {e}")
+            self._count('errors')
+
+    def clear(self):
+        self.store.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'backend': 'sqlite' if isinstance(self.store, SQLiteResponseStore) else 'memory',
+                'hits': self.hits,
+                'misses': self.misses,
+                'errors': self.errors,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+llm_cache = LLMResponseCache()
+
+
+def init_app(app):
+    """Pick the store from LLM_CACHE_PATH / LLM_CACHE_SIZE / LLM_CACHE_TTL"""
+    size = app.config.get('LLM_CACHE_SIZE', 256)
+    ttl = app.config.get('LLM_CACHE_TTL', 300.0)
+    path = app.config.get('LLM_CACHE_PATH')
+    llm_cache.store = SQLiteResponseStore(path, size, ttl) if path else ResponseCache(size, ttl)
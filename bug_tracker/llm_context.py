@@ -0,0 +1,135 @@
+"""
+Token-budgeted issue context for the chatbot prompt.
+
+The LLM only needs enough of each issue to answer, so the context is built
+as a compact table (one pipe-separated row per issue, dates as YYYY-MM-DD,
+descriptions cut to a few words) and filled until a token budget is reached.
+Issues are ranked before cutting, so the ones the model sees are the most
+relevant: active before closed, higher priority first, then the nearest due
+date. Results that are already ranked, such as search hits, keep their order.
+
+Tokens are counted with tiktoken when it is installed, otherwise estimated
+at four characters per token. Each build reports the tokens the previous
+full-text format (ResponseFormatter.format_issues_for_llm) would have used,
+estimated from the issues it rendered.
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from models import PRIORITY_RANKS
+
+DEFAULT_TOKEN_BUDGET = 1500
+DEFAULT_DESCRIPTION_CHARS = 160
+TABLE_COLUMNS = ('id', 'title', 'status', 'priority', 'assignee', 'due', 'description')
+
+_token_counter = None
+
+
+def count_tokens(text: str) -> int:
+    """Number of tokens in ``text`` for the chat models"""
+    global _token_counter
+    if _token_counter is None:
+        try:
+            import tiktoken
+            encoding = tiktoken.get_encoding('cl100k_base')
+            _token_counter = lambda value: len(encoding.encode(value))
+        except Exception:
+            _token_counter = lambda value: (len(value) + 3) // 4
+    return _token_counter(text)
+
+
+def relevance_key(issue: Dict) -> Tuple:
+    """Sort key: active first, then priority, then earliest due date, then newest"""
+    return (
+        issue.get('status') == 'Closed',
+        -PRIORITY_RANKS.get(issue.get('priority'), 0),
+        issue.get('due_date') or '9999',
+        -(issue.get('id') or 0),
+    )
+
+
+def _clean(value: Any) -> str:
+    return ' '.join(str(value).split()).replace('|', '/')
+
+
+def _truncate(text: str, limit: int) -> str:
+    text = _clean(text or '')
+    if len(text) <= limit:
+        return text
+    cut = text[:limit].rsplit(' ', 1)[0] or text[:limit]
+    return cut + '…'
+
+
+def table_row(issue: Dict, description_chars: int = DEFAULT_DESCRIPTION_CHARS) -> str:
+    assignee = issue['assignee']['name'] if issue.get('assignee') else '-'
+    return '|'.join((
+        str(issue['id']),
+        _clean(issue['title']),
+        issue.get('status') or '-',
+        issue.get('priority') or '-',
+        _clean(assignee),
+        (issue.get('due_date') or '-')[:10],
+        _truncate(issue.get('description'), description_chars),
+    ))
+
+
+def build_context(
+    issues: List[Dict],
+    full_format: Callable[[List[Dict]], str],
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
+    description_chars: int = DEFAULT_DESCRIPTION_CHARS,
+    rank: bool = True,
+    compact: bool = True,
+    total: Optional[int] = None,
+) -> Tuple[str, Dict[str, int]]:
+    """Return (context text, stats) for ``issues`` within ``token_budget``.
+
+    ``full_format`` renders the uncompressed context; it is the output when
+    ``compact`` is false and the baseline for the ``tokens_saved`` stat.
+    ``total`` is the number of matching issues when ``issues`` holds only the
+    most relevant of them. Rows are rendered one at a time and rendering
+    stops at the budget, so the cost follows what fits in the prompt, not
+    the number of issues; the full-format size of the issues left out is
+    extrapolated from the ones rendered.
+    """
+    total = len(issues) if total is None else max(total, len(issues))
+    if not issues:
+        full_text = full_format(issues)
+        full_tokens = count_tokens(full_text)
+        return full_text, {'issues': total, 'included': 0, 'tokens': full_tokens,
+                           'full_tokens': full_tokens, 'tokens_saved': 0}
+
+    ordered = sorted(issues, key=relevance_key) if rank else issues
+    if compact:
+        header = '|'.join(TABLE_COLUMNS)
+        render_row = lambda issue: table_row(issue, description_chars)
+        separator = '\n'
+    else:
+        header = ''
+        render_row = lambda issue: full_format([issue])
+        separator = '\n---\n'
+
+    lines, used = [header] if header else [], count_tokens(header)
+    rendered = full_tokens_rendered = 0
+    for issue in ordered:
+        row = render_row(issue)
+        rendered += 1
+        full_tokens_rendered += count_tokens(full_format([issue]) if compact else row)
+        cost = count_tokens(row) + 1
+        if used + cost > token_budget and len(lines) > (1 if header else 0):
+            break
+        lines.append(row)
+        used += cost
+    included = len(lines) - (1 if header else 0)
+    if included < total:
+        lines.append(f"({total - included} more issue(s) omitted; ask a narrower question to see them)")
+
+    text = separator.join(lines)
+    tokens = count_tokens(text)
+    full_tokens = full_tokens_rendered * total // rendered
+    stats = {
+        'issues': total,
+        'included': included,
+        'tokens': tokens,
+        'full_tokens': full_tokens,
+        'tokens_saved': max(0, full_tokens - tokens),
+    }
+    return text, stats
@@ -0,0 +1,214 @@
+"""
+Request instrumentation served in Prometheus text format on ``/metrics``.
+
+Collected per worker process (scrape every worker, or aggregate in
+Prometheus):
+
+- ``http_request_duration_seconds``: latency histogram per method, route
+  rule and status. For streamed responses this is the time to the first byte.
+- ``http_request_sql_queries`` / ``http_request_sql_seconds``: number of SQL
+  statements and total time spent in them per request, from SQLAlchemy
+  cursor events. The same numbers are sent back in a ``Server-Timing``
+  header (``sql`` and ``app``), so a single request shows in the browser
+  whether its time went to the database or to Python.
+- ``sql_queries_total`` / ``sql_query_duration_seconds``: every statement,
+  including those outside requests.
+- ``openai_request_duration_seconds``: OpenAI calls made by LLMService.
+
+The overhead is a few ``perf_counter`` calls and dictionary updates under a
+lock per request and per statement. Set ``METRICS_ENABLED=false`` to turn it
+off entirely.
+"""
+import bisect
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Seconds; the default buckets of the Prometheus client libraries
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 250)
+LLM_BUCKETS = (0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+_G_KEY = 'metrics_request'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1.0):
+        with self._lock:
+            self._values[labels] += amount
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            yield f'{self.name}{_format_labels(self.labelnames, labels)} {value:g}'
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (last one is +Inf), count, sum]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0, 0.0]
+            entry[0][index] += 1
+            entry[1] += 1
+            entry[2] += value
+
+    def samples(self):
+        with self._lock:
+            items = sorted((labels, (list(e[0]), e[1], e[2])) for labels, e in self._values.items())
+        for labels, (counts, count, total) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else f'{bound:g}'
+                yield (f'{self.name}_bucket'
+                       f'{_format_labels(self.labelnames, labels, [("le", le)])} {cumulative}')
+            yield f'{self.name}_count{_format_labels(self.labelnames, labels)} {count}'
+            yield f'{self.name}_sum{_format_labels(self.labelnames, labels)} {total:g}'
+
+
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'HTTP request latency', ('method', 'route', 'status'))
+REQUEST_SQL_QUERIES = Histogram(
+    'http_request_sql_queries', 'SQL statements executed per request', ('method', 'route'),
+    buckets=SQL_COUNT_BUCKETS)
+REQUEST_SQL_SECONDS = Histogram(
+    'http_request_sql_seconds', 'Time spent in SQL per request', ('method', 'route'))
+SQL_QUERIES = Counter('sql_queries_total', 'SQL statements executed')
+SQL_DURATION = Histogram('sql_query_duration_seconds', 'SQL statement latency')
+OPENAI_DURATION = Histogram(
+    'openai_request_duration_seconds', 'OpenAI API call duration', ('call', 'outcome'),
+    buckets=LLM_BUCKETS)
+
+REGISTRY = [REQUEST_DURATION, REQUEST_SQL_QUERIES, REQUEST_SQL_SECONDS,
+            SQL_QUERIES, SQL_DURATION, OPENAI_DURATION]
+
+_enabled = False
+
+
+def render():
+    """All metrics in the Prometheus text exposition format"""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        lines.extend(metric.samples())
+    return '\n'.join(lines) + '\n'
+
+
+@contextmanager
+def time_openai(call):
+    """Record the duration of an OpenAI call as ok or error"""
+    started = time.perf_counter()
+    outcome = 'error'
+    try:
+        yield
+        outcome = 'ok'
+    finally:
+        if _enabled:
+            OPENAI_DURATION.observe(time.perf_counter() - started, call, outcome)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('metrics_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('metrics_started')
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    SQL_QUERIES.inc()
+    SQL_DURATION.observe(elapsed)
+    if has_request_context():
+        current = g.get(_G_KEY)
+        if current is not None:
+            current[1] += 1
+            current[2] += elapsed
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    conn = exception_context.connection
+    if conn is not None and conn.info.get('metrics_started'):
+        conn.info['metrics_started'].pop()
+
+
+def _before_request():
+    # [start time, SQL statements, SQL seconds]
+    g.setdefault(_G_KEY, [time.perf_counter(), 0, 0.0])
+
+
+def _after_request(response):
+    current = g.pop(_G_KEY, None)
+    if current is None:
+        return response
+    started, queries, sql_seconds = current
+    elapsed = time.perf_counter() - started
+    route = request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+    if route != '/metrics':
+        REQUEST_DURATION.observe(elapsed, request.method, route, str(response.status_code))
+        REQUEST_SQL_QUERIES.observe(queries, request.method, route)
+        REQUEST_SQL_SECONDS.observe(sql_seconds, request.method, route)
+    response.headers.add(
+        'Server-Timing',
+        f'sql;dur={sql_seconds * 1000:.1f};desc="{queries} queries", '
+        f'app;dur={(elapsed - sql_seconds) * 1000:.1f}'
+    )
+    return response
+
+
+def metrics_view():
+    return Response(render(), mimetype='text/plain; version=0.0.4')
+
+
+def init_app(app):
+    """Install the request hooks, SQL listeners and the /metrics route"""
+    global _enabled
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+    _enabled = True
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'handle_error', _handle_error)
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
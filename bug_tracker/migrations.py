@@ -0,0 +1,159 @@
+"""
+Lightweight schema migrations.
+
+Each migration is a function that receives an open connection and brings the
+schema from the previous version to its own. The applied version is stored in
+the ``schema_version`` table:
+
+- a fresh database gets the current models through ``create_all`` and then
+  runs every migration, so migrations must be idempotent (they only add what
+  ``create_all`` cannot express, such as dialect specific search indexes);
+- a database created by older releases (tables but no ``schema_version``)
+  is treated as version 1 and upgraded step by step.
+"""
+import logging
+from sqlalchemy import Integer, insert, inspect, select, text
+from extensions import db
+import database
+
+logger = logging.getLogger(__name__)
+
+
+def _add_filter_indexes(conn):
+    """Add the composite indexes declared on Issue and the User.name index"""
+    from models import Issue, User
+
+    for index in list(Issue.__table__.indexes) + list(User.__table__.indexes):
+        index.create(conn, checkfirst=True)
+
+
+def _add_search_indexes(conn):
+    """Add trigram/full-text indexes (PostgreSQL) or the FTS5 table (SQLite)"""
+    import search
+
+    search.install(conn)
+
+
+def _add_data_versions(conn):
+    """Add the per-table write counters used by cache.py"""
+    from cache import TRACKED_TABLES
+    from models import DataVersion
+
+    DataVersion.__table__.create(conn, checkfirst=True)
+    existing = set(conn.execute(select(DataVersion.name)).scalars())
+    for name in TRACKED_TABLES:
+        if name not in existing:
+            conn.execute(insert(DataVersion).values(name=name, version=0))
+
+
+def _store_ordinal_enums(conn):
+    """Store Issue.status and Issue.priority as SMALLINT ranks instead of strings.
+    
+    Unknown or NULL values become the column default ('Open' / 'Medium').
+    PostgreSQL converts the columns in place; SQLite cannot change a column
+    type, so the issue table is rebuilt with the same ids and the FTS
+    triggers are re-created.
+    """
+    import search
+    from models import Issue
+    
+    columns = {c['name']: c['type'] for c in inspect(conn).get_columns('issue')}
+    if all(isinstance(columns[name], Integer) for name in ('status', 'priority')):
+        # Already ordinal (created from the current models); only add indexes
+        for index in Issue.__table__.indexes:
+            index.create(conn, checkfirst=True)
+        return
+    
+    status_sql = Issue.status.type.ordinal_case('status', 'Open')
+    priority_sql = Issue.priority.type.ordinal_case('priority', 'Medium')
+    
+    if conn.dialect.name == 'postgresql':
+        conn.execute(text(f'ALTER TABLE issue ALTER COLUMN status TYPE SMALLINT USING {status_sql}'))
+        conn.execute(text(f'ALTER TABLE issue ALTER COLUMN priority TYPE SMALLINT USING {priority_sql}'))
+        for index in Issue.__table__.indexes:
+            index.create(conn, checkfirst=True)
+        return
+    
+    names = [c.name for c in Issue.__table__.columns]
+    selected = [
+        status_sql if name == 'status' else priority_sql if name == 'priority' else name
+        for name in names
+    ]
+    for index in inspect(conn).get_indexes('issue'):
+        conn.execute(text(f'DROP INDEX {index["name"]}'))
+    conn.execute(text('ALTER TABLE issue RENAME TO issue_old'))
+    Issue.__table__.create(conn)
+    conn.execute(text(
+        f'INSERT INTO issue ({", ".join(names)}) SELECT {", ".join(selected)} FROM issue_old'
+    ))
+    conn.execute(text('DROP TABLE issue_old'))
+    search.install(conn)
+
+
+def _order_assignee_index(conn):
+    """Replace the (assignee_id, status) index with (assignee_id, created_at, id).
+
+    The assignee filter of the issue list orders by (created_at, id); the
+    old index found the rows but still needed a sort.
+    """
+    from models import Issue
+
+    if any(index['name'] == 'ix_issue_assignee_id_status' for index in inspect(conn).get_indexes('issue')):
+        conn.execute(text('DROP INDEX ix_issue_assignee_id_status'))
+    for index in Issue.__table__.indexes:
+        index.create(conn, checkfirst=True)
+
+
+# (version, description, upgrade function); version 1 is the original schema
+MIGRATIONS = [
+    (2, 'indexes for hot filter columns', _add_filter_indexes),
+    (3, 'title/description search indexes', _add_search_indexes),
+    (4, 'data version counters for response caching', _add_data_versions),
+    (5, 'ordinal status and priority columns', _store_ordinal_enums),
+    (6, 'assignee index in issue list order', _order_assignee_index),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0] if MIGRATIONS else 1
+
+
+def current_version(conn):
+    """Return the schema version of the database, or None if it is empty"""
+    tables = inspect(conn).get_table_names()
+    if 'schema_version' in tables:
+        return conn.execute(text('SELECT version FROM schema_version')).scalar()
+    if 'issue' in tables:
+        return 1  # created by db.create_all() before migrations existed
+    return None
+
+
+def _set_version(conn, version):
+    conn.execute(text('DELETE FROM schema_version'))
+    conn.execute(text('INSERT INTO schema_version (version) VALUES (:v)'), {'v': version})
+
+
+def upgrade():
+    """Create or upgrade the schema to LATEST_VERSION; returns the final version"""
+    # Make sure every model is registered on the metadata
+    import models  # noqa: F401
+
+    with db.engine.begin() as conn:
+        # Column rewrites and index builds on a large table outlast the
+        # per-request statement timeout
+        database.disable_statement_timeout(conn)
+        version = current_version(conn)
+        conn.execute(text('CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)'))
+
+        if version is None:
+            db.metadata.create_all(conn)
+            logger.info("Created schema from models")
+            version = 1
+
+        for target, description, migrate in MIGRATIONS:
+            if target <= version:
+                continue
+            logger.info(f"Migrating schema to version {target}: {description}")
+            migrate(conn)
+            version = target
+        _set_version(conn, version)
+
+    return version
@@ -1,13 +1,57 @@
 from datetime import datetime
+from sqlalchemy import type_coerce
+from sqlalchemy.ext.hybrid import hybrid_property
 from extensions import db
 
+# Allowed values, in rank order: stored as 1, 2, 3 (see OrdinalEnum)
+ISSUE_STATUSES = ('Open', 'In-Progress', 'Closed')
+ISSUE_PRIORITIES = ('Low', 'Medium', 'High')
+
+# Numeric rank of each priority, so SQL can order High > Medium > Low
+PRIORITY_RANKS = {priority: rank for rank, priority in enumerate(ISSUE_PRIORITIES, 1)}
+
+
+class OrdinalEnum(db.TypeDecorator):
+    """A fixed set of strings stored as a SMALLINT rank (1-based, in order).
+    
+    Python code and the API keep using the strings; in SQL the column sorts
+    by rank and fits compact integer indexes. Binding a value outside the
+    set raises ValueError.
+    """
+    impl = db.SmallInteger
+    cache_ok = True
+    
+    def __init__(self, values):
+        super().__init__()
+        self.values = tuple(values)
+        self._ranks = {value: rank for rank, value in enumerate(self.values, 1)}
+    
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, int):
+            return value
+        try:
+            return self._ranks[value]
+        except KeyError:
+            raise ValueError(f'{value!r} must be one of: {", ".join(self.values)}') from None
+    
+    def process_result_value(self, value, dialect):
+        return None if value is None else self.values[value - 1]
+    
+    def ordinal_case(self, column_sql, default):
+        """SQL CASE converting a string column to ranks; other values become ``default``"""
+        whens = ' '.join(f"WHEN '{value}' THEN {rank}" for value, rank in self._ranks.items())
+        return f'CASE {column_sql} {whens} ELSE {self._ranks[default]} END'
+
+
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(100), nullable=False)
+    name = db.Column(db.String(100), nullable=False, index=True)
     role = db.Column(db.String(50), nullable=False)
     
-    # Relationship: one user can have many issues
-    issues = db.relationship('Issue', backref='assignee', lazy=True)
+    # Relationship: one user can have many issues.
+    # Issue.assignee is joined-loaded so serializing a list of issues costs
+    # a single SELECT instead of one extra query per assignee.
+    issues = db.relationship('Issue', backref=db.backref('assignee', lazy='joined'), lazy=True)
     
     def to_dict(self):
         return {
@@ -17,16 +61,49 @@ class User(db.Model):
         }
 
 class Issue(db.Model):
+    # Composite indexes matched to the list filters and chatbot queries.
+    # Existing databases pick these up through migrations.upgrade().
+    __table_args__ = (
+        db.Index('ix_issue_status_priority_created_at', 'status', 'priority', 'created_at'),
+        db.Index('ix_issue_status_created_at', 'status', 'created_at'),
+        # Assignee filter of the issue list, already in page order
+        db.Index('ix_issue_assignee_id_created_at_id', 'assignee_id', 'created_at', 'id'),
+        db.Index('ix_issue_created_at_id', 'created_at', 'id'),
+        db.Index('ix_issue_due_date', 'due_date'),
+        # Chatbot "top issues": one scan in priority order, stopping at LIMIT
+        db.Index('ix_issue_priority_created_at', 'priority', 'created_at'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text, nullable=False)
-    status = db.Column(db.String(50), default='Open')  # Open, In-Progress, Closed
-    priority = db.Column(db.String(50), default='Medium')  # Low, Medium, High
+    status = db.Column(OrdinalEnum(ISSUE_STATUSES), default='Open')
+    priority = db.Column(OrdinalEnum(ISSUE_PRIORITIES), default='Medium')
     assignee_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     due_date = db.Column(db.DateTime, nullable=True)
     
-    def to_dict(self):
+    # Keys produced by to_dict(), in output order
+    FIELDS = ('id', 'title', 'description', 'status', 'priority',
+              'assignee_id', 'assignee', 'created_at', 'due_date')
+    
+    @hybrid_property
+    def priority_rank(self):
+        return PRIORITY_RANKS.get(self.priority, 0)
+    
+    @priority_rank.expression
+    def priority_rank(cls):
+        # The column already stores the rank
+        return type_coerce(cls.priority, db.SmallInteger)
+    
+    def to_dict(self, fields=None):
+        """Serialize the issue, optionally limited to a subset of FIELDS.
+        
+        Only the requested attributes are touched, so a query using
+        load_only() for the same fields never loads the deferred columns.
+        """
+        if fields is not None:
+            return {field: self._serialize_field(field) for field in fields}
         return {
             'id': self.id,
             'title': self.title,
@@ -37,4 +114,22 @@ class Issue(db.Model):
             'assignee': self.assignee.to_dict() if self.assignee else None,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'due_date': self.due_date.isoformat() if self.due_date else None
-        }
\ No newline at end of file
+        }
+    
+    def _serialize_field(self, field):
+        if field == 'assignee':
+            return self.assignee.to_dict() if self.assignee else None
+        value = getattr(self, field)
+        if field in ('created_at', 'due_date'):
+            return value.isoformat() if value else None
+        return value
+
+
+class DataVersion(db.Model):
+    """Per-table write counter, bumped in the same transaction as every write.
+    
+    Used as a cheap validator for conditional GETs and response caching; see
+    cache.py.
+    """
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
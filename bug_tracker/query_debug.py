@@ -0,0 +1,208 @@
+"""
+SQL debugging aids for development and tests: a slow query log and an N+1
+detector.
+
+Enabled with ``SQL_DEBUG=true``, or automatically when the app runs in debug
+or testing mode. Cursor events on every engine then:
+
+- log statements slower than ``SLOW_QUERY_MS`` with the route that ran them;
+- count statement shapes (SQL text with whitespace and IN lists collapsed)
+  per app context, that is per request, CLI command or ``seed_data`` run, and
+  report any shape executed ``NPLUSONE_THRESHOLD`` times or more when the
+  context ends. Typical culprits are a relationship lazy-loaded inside a
+  loop, such as ``Issue.assignee`` in ``to_dict``, or a lookup per item.
+  With ``NPLUSONE_RAISE`` (the default under testing) the report is raised
+  as ``NPlusOneError`` instead of logged.
+
+``count_queries()`` and ``assert_constant_queries()`` work regardless of the
+setting and are meant for tests (see benchmarks/query_counts.py).
+"""
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from flask import g, has_app_context, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_SHAPES_KEY = 'query_shapes'
+_PARAM = r'(?:\?|%s|%\(\w+\)s|:\w+)'
+_IN_LIST = re.compile(rf'\(\s*{_PARAM}(?:\s*,\s*{_PARAM})+\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+# Only data statements count towards N+1; schema introspection (PRAGMA,
+# catalog queries from migrations) legitimately repeats per table or index
+_DATA_STATEMENT = re.compile(r'^(?:SELECT|INSERT|UPDATE|DELETE|WITH)\b', re.IGNORECASE)
+_CATALOGS = ('pg_catalog', 'information_schema', 'sqlite_master', 'sqlite_schema')
+
+_settings = {'enabled': False, 'slow_ms': 100.0, 'threshold': 5, 'raise': False}
+_collectors = threading.local()
+
+
+class NPlusOneError(AssertionError):
+    """A statement shape ran too often within one request or app context"""
+
+
+def statement_shape(statement: str) -> str:
+    """SQL text with whitespace normalized and parameter lists collapsed"""
+    return _IN_LIST.sub('(?...)', _WHITESPACE.sub(' ', statement).strip())
+
+
+def _location() -> str:
+    if has_request_context():
+        rule = request.url_rule.rule if request.url_rule is not None else request.path
+        return f'{request.method} {rule}'
+    return 'app context' if has_app_context() else 'no app context'
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_debug_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('query_debug_started')
+    if not started:
+        return
+    elapsed_ms = (time.perf_counter() - started.pop()) * 1000
+
+    for statements in getattr(_collectors, 'active', ()):
+        statements.append(statement)
+
+    if not _settings['enabled']:
+        return
+    if elapsed_ms >= _settings['slow_ms']:
+        logger.warning(f"Slow query ({elapsed_ms:.1f} ms) in {_location()}: {statement_shape(statement)}")
+    if has_app_context():
+        shape = statement_shape(statement)
+        if _DATA_STATEMENT.match(shape) and not any(name in shape for name in _CATALOGS):
+            g.setdefault(_SHAPES_KEY, Counter())[shape] += 1
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get('query_debug_started'):
+        conn.info['query_debug_started'].pop()
+
+
+def _report_repeated(location):
+    shapes = g.pop(_SHAPES_KEY, None)
+    if not shapes:
+        return
+    repeated = [(count, shape) for shape, count in shapes.items() if count >= _settings['threshold']]
+    if not repeated:
+        return
+    lines = [f"Possible N+1 in {location}: {len(repeated)} statement(s) repeated"]
+    lines += [f"  {count}x {shape}" for count, shape in sorted(repeated, reverse=True)]
+    message = '\n'.join(lines)
+    if _settings['raise']:
+        raise NPlusOneError(message)
+    logger.warning(message)
+
+
+def _after_request(response):
+    # Reported here rather than at teardown so the route is still known
+    _report_repeated(_location())
+    return response
+
+
+def _teardown_appcontext(exc):
+    if exc is None:
+        _report_repeated('app context')
+
+
+def _install_listeners():
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'handle_error', _handle_error)
+
+
+def init_app(app):
+    """Turn the slow query log and N+1 detector on for debug/test apps"""
+    enabled = app.config.get('SQL_DEBUG')
+    if enabled is None:
+        enabled = app.debug or app.testing
+    if not enabled:
+        return
+    raise_errors = app.config.get('NPLUSONE_RAISE')
+    _settings.update({
+        'enabled': True,
+        'slow_ms': app.config.get('SLOW_QUERY_MS', 100.0),
+        'threshold': app.config.get('NPLUSONE_THRESHOLD', 5),
+        'raise': app.testing if raise_errors is None else raise_errors,
+    })
+    _install_listeners()
+    app.after_request(_after_request)
+    app.teardown_appcontext(_teardown_appcontext)
+
+
+@contextmanager
+def allow_repeated():
+    """Leave the statements run inside the block out of the N+1 report, for
+    loops that repeat a statement on purpose such as batched bulk loads"""
+    if not has_app_context():
+        yield
+        return
+    saved = g.pop(_SHAPES_KEY, None)
+    try:
+        yield
+    finally:
+        g.pop(_SHAPES_KEY, None)
+        if saved is not None:
+            g.setdefault(_SHAPES_KEY, Counter()).update(saved)
+
+
+@contextmanager
+def count_queries():
+    """Collect the SQL statements executed in this thread inside the block.
+
+        with count_queries() as statements:
+            client.get('/issues')
+        assert len(statements) <= 2
+    """
+    _install_listeners()
+    statements = []
+    active = getattr(_collectors, 'active', None)
+    if active is None:
+        active = _collectors.active = []
+    active.append(statements)
+    try:
+        yield statements
+    finally:
+        active.remove(statements)
+
+
+def assert_constant_queries(send_request, grow_data, label='request'):
+    """Fail when ``send_request()`` runs more SQL after ``grow_data()`` adds rows.
+
+    The response cache is bypassed and each measurement is preceded by a
+    warm-up call, so one-off work such as loading the user directory is not
+    mistaken for growth. Returns the (before, after) statement counts.
+    """
+    from cache import response_cache
+
+    saved_size = response_cache.max_size
+    response_cache.max_size = 0
+    response_cache.clear()
+    try:
+        send_request()
+        with count_queries() as before:
+            send_request()
+        grow_data()
+        send_request()
+        with count_queries() as after:
+            send_request()
+    finally:
+        response_cache.max_size = saved_size
+
+    if len(after) > len(before):
+        grown = Counter(statement_shape(s) for s in after)
+        grown.subtract(Counter(statement_shape(s) for s in before))
+        details = '\n'.join(f"  +{n} {shape}" for shape, n in grown.most_common() if n > 0)
+        raise NPlusOneError(
+            f"{label}: {len(before)} queries before, {len(after)} after adding data\n{details}"
+        )
+    return len(before), len(after)
@@ -1,11 +1,29 @@
-from flask import Blueprint, request, jsonify, render_template
-from functools import lru_cache
-from typing import Optional, Dict, List, Any
+"""
+Chatbot routes: classify a message, fetch the matching issues, ask the LLM.
+
+Message parsing is not single-pass. MessageParser.parse() lowercases the
+message once, then runs up to 11 precompiled regex searches: the assignee
+patterns and the search patterns in list order until one yields a usable
+value, plus one alternation each for task suggestions, priorities and
+statuses. A single regex of per-pattern lookaheads keeps the list priority
+too, but it loses the engine's literal-prefix scan and measured slower than
+these separate searches (benchmarks/intent_parser.py).
+"""
+from flask import Blueprint, Response, request, jsonify, render_template, current_app, has_app_context
+from typing import Optional, Dict, Iterator, List, Any, Tuple
 from datetime import datetime
-from sqlalchemy import or_
+import json
 import os
 import re
 import logging
+import threading
+import llm_context
+import metrics
+import search
+import suggestions
+from llm_cache import llm_cache, make_key
+from serializers import issue_dicts
+from user_directory import user_directory
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -13,17 +31,26 @@ logger = logging.getLogger(__name__)
 chatbot_bp = Blueprint('chatbot', __name__)
 
 # Constants
-PRIORITY_ORDER = {'High': 3, 'Medium': 2, 'Low': 1}
 MAX_ISSUES_LIMIT = 10
+# Most relevant issues fetched for a status or assignee question; well
+# above what the default context token budget fits (see llm_context.py)
+MAX_CONTEXT_ISSUES = 200
 MAX_RESPONSE_TOKENS = 500
+LLM_MODEL = "gpt-3.5-turbo"
 
 # Regex patterns as constants
+# "who is X" asks about the person rather than their work, so it is a
+# separate question (and cache intent) on the same assignee lookup
+WHO_PATTERNS = [
+    r"who (?:is|are) (\w+)",
+]
+
 ASSIGNEE_PATTERNS = [
     r"what (?:is|are) (\w+) (?:working on|doing|assigned to)",
     r"(\w+)'s (?:tasks|issues|work)",
     r"show (?:me )?(?:issues|tasks) (?:for|assigned to|of) (\w+)(?:\s|$)",
     r"what (?:does|is) (\w+) (?:have|working on)",
-    r"who (?:is|are) (\w+)",
+    *WHO_PATTERNS,
 ]
 
 TASK_SUGGESTION_PATTERNS = [
@@ -41,6 +68,12 @@ PRIORITY_PATTERNS = [
     r"(?:urgent|important) (?:tasks|issues)",
 ]
 
+SEARCH_PATTERNS = [
+    r"(?:find|search for|search|look for) (?:issues?|tasks?|bugs?) (?:about|for|with|mentioning|related to) (.+)",
+    r"(?:find|search for|look for) (?:anything|something) (?:about|on|related to) (.+)",
+    r"^search (?:for )?(.+)",
+]
+
 STATUS_PATTERNS = [
     r"(?:open|in-progress|closed) (?:issues|tasks)",
     r"show (?:me )?(?:all )?(?:open|in-progress|closed)",
@@ -49,19 +82,88 @@ STATUS_PATTERNS = [
 COMMON_WORDS = {'what', 'show', 'who', 'me', 'all', 'the', 'top', 'high', 'is', 'are'}
 
 
+# Process-wide OpenAI client: created lazily on first use and re-created
+# after a fork, so every gunicorn worker owns its connection pool
+_openai_client = None
+_openai_client_key = None
+_openai_client_lock = threading.Lock()
+
+
+def _openai_settings() -> Dict[str, Any]:
+    """Client settings from the app config, falling back to the defaults"""
+    from config import Config
+    config = current_app.config if has_app_context() else vars(Config)
+    return {
+        name: config.get(name, getattr(Config, name))
+        for name in (
+            'OPENAI_BASE_URL', 'OPENAI_TIMEOUT', 'OPENAI_CONNECT_TIMEOUT',
+            'OPENAI_MAX_RETRIES', 'OPENAI_MAX_CONNECTIONS', 'OPENAI_MAX_KEEPALIVE'
+        )
+    }
+
+
+def _build_openai_client(api_key: str, settings: Dict[str, Any]):
+    from openai import DefaultHttpxClient, OpenAI
+    try:
+        import httpx2 as httpx  # transport of current openai releases
+    except ImportError:
+        import httpx
+    
+    timeout = httpx.Timeout(settings['OPENAI_TIMEOUT'], connect=settings['OPENAI_CONNECT_TIMEOUT'])
+    http_client = DefaultHttpxClient(
+        timeout=timeout,
+        limits=httpx.Limits(
+            max_connections=settings['OPENAI_MAX_CONNECTIONS'],
+            max_keepalive_connections=settings['OPENAI_MAX_KEEPALIVE'],
+        ),
+    )
+    # The SDK retries connection errors, 408/409/429 and 5xx responses with
+    # exponential backoff and jitter, honouring Retry-After
+    return OpenAI(
+        api_key=api_key,
+        base_url=settings['OPENAI_BASE_URL'] or None,
+        timeout=timeout,
+        max_retries=settings['OPENAI_MAX_RETRIES'],
+        http_client=http_client,
+    )
+
+
+# Bulkhead for LLM calls: at most CHAT_MAX_LLM_CALLS completions in flight per
+# worker, so slow OpenAI responses never occupy every gunicorn thread and the
+# issue endpoints always find one free
+_llm_slots = None
+_llm_slots_lock = threading.Lock()
+
+
+def _llm_call_slots() -> threading.BoundedSemaphore:
+    global _llm_slots
+    if _llm_slots is None:
+        with _llm_slots_lock:
+            if _llm_slots is None:
+                _llm_slots = threading.BoundedSemaphore(current_app.config.get('CHAT_MAX_LLM_CALLS', 4))
+    return _llm_slots
+
+
 class ChatbotService:
     """Service class for chatbot operations"""
     
     @staticmethod
     def get_openai_client():
-        """Get OpenAI client with error handling"""
+        """Get the shared OpenAI client with error handling"""
+        global _openai_client, _openai_client_key
         try:
-            from openai import OpenAI
             api_key = os.environ.get('OPENAI_API_KEY')
             if not api_key:
                 logger.warning("OpenAI API key not found")
                 return None
-            return OpenAI(api_key=api_key)
+            settings = _openai_settings()
+            key = (os.getpid(), api_key, tuple(sorted(settings.items())))
+            if _openai_client_key != key:
+                with _openai_client_lock:
+                    if _openai_client_key != key:
+                        _openai_client = _build_openai_client(api_key, settings)
+                        _openai_client_key = key
+            return _openai_client
         except ImportError:
             logger.error("OpenAI package not installed")
             return None
@@ -77,55 +179,95 @@ class ChatbotService:
         return Issue, User, db
 
 
+def _compile_any(patterns: List[str]) -> re.Pattern:
+    """Fold yes/no patterns into one alternation searched in a single pass"""
+    return re.compile('|'.join(f'(?:{p})' for p in patterns))
+
+
+# Compiled once at import. Assignee and search patterns are tried in list
+# order (the first pattern that yields a usable value wins), so they stay
+# separate searches; the yes/no intents are each a single alternation.
+ASSIGNEE_REGEXES = [(re.compile(p), 'who' if p in WHO_PATTERNS else 'work') for p in ASSIGNEE_PATTERNS]
+SEARCH_REGEXES = [re.compile(p) for p in SEARCH_PATTERNS]
+TASK_SUGGESTION_REGEX = _compile_any(TASK_SUGGESTION_PATTERNS)
+PRIORITY_REGEX = _compile_any(PRIORITY_PATTERNS)
+STATUS_REGEX = _compile_any(STATUS_PATTERNS)
+
+
 class MessageParser:
-    """Parse and extract intent from user messages"""
+    """Parse and extract intent from user messages.
+    
+    The public methods accept the raw message; the underscored ones expect
+    it already lowercased so parse() only lowercases once.
+    """
     
     @staticmethod
-    def extract_assignee(message: str) -> Optional[str]:
-        """Extract assignee name from message"""
-        message_lower = message.lower()
-        
-        for pattern in ASSIGNEE_PATTERNS:
-            match = re.search(pattern, message_lower)
-            if match:
-                potential_name = match.group(1).capitalize()
-                if potential_name.lower() not in COMMON_WORDS:
-                    return potential_name
+    def _assignee(text: str) -> Tuple[Optional[str], Optional[str]]:
+        """(name, 'work' or 'who') from the first pattern naming someone"""
+        for regex, question in ASSIGNEE_REGEXES:
+            match = regex.search(text)
+            if match and match.group(1) not in COMMON_WORDS:
+                return match.group(1).capitalize(), question
+        return None, None
+    
+    @staticmethod
+    def _status(text: str) -> Optional[str]:
+        if STATUS_REGEX.search(text):
+            if 'open' in text:
+                return 'Open'
+            elif 'in-progress' in text or 'in progress' in text:
+                return 'In-Progress'
+            elif 'closed' in text:
+                return 'Closed'
         return None
     
     @staticmethod
-    def extract_status(message: str) -> Optional[str]:
-        """Extract status from message"""
-        message_lower = message.lower()
-        
-        for pattern in STATUS_PATTERNS:
-            if re.search(pattern, message_lower):
-                if 'open' in message_lower:
-                    return 'Open'
-                elif 'in-progress' in message_lower or 'in progress' in message_lower:
-                    return 'In-Progress'
-                elif 'closed' in message_lower:
-                    return 'Closed'
+    def _search_term(text: str) -> Optional[str]:
+        for regex in SEARCH_REGEXES:
+            match = regex.search(text)
+            if match:
+                term = match.group(1).strip(' ?.!"\'')
+                if term:
+                    return term
         return None
     
+    @classmethod
+    def extract_assignee(cls, message: str) -> Optional[str]:
+        """Extract assignee name from message"""
+        return cls._assignee(message.lower())[0]
+    
+    @classmethod
+    def extract_status(cls, message: str) -> Optional[str]:
+        """Extract status from message"""
+        return cls._status(message.lower())
+    
+    @classmethod
+    def extract_search_term(cls, message: str) -> Optional[str]:
+        """Extract a free-text search term from message"""
+        return cls._search_term(message.lower())
+    
     @staticmethod
     def is_task_suggestion(message: str) -> bool:
         """Check if message is asking for task suggestion"""
-        return any(re.search(p, message.lower()) for p in TASK_SUGGESTION_PATTERNS)
+        return TASK_SUGGESTION_REGEX.search(message.lower()) is not None
     
     @staticmethod
     def is_priority_query(message: str) -> bool:
         """Check if message is asking about priorities"""
-        return any(re.search(p, message.lower()) for p in PRIORITY_PATTERNS)
+        return PRIORITY_REGEX.search(message.lower()) is not None
     
     @classmethod
     def parse(cls, message: str) -> Dict[str, Any]:
         """Parse message and extract all intents"""
+        text = message.lower()
+        assignee_name, assignee_question = cls._assignee(text)
         return {
-            'assignee_name': cls.extract_assignee(message),
-            'is_priority_query': cls.is_priority_query(message),
-            'is_task_suggestion': cls.is_task_suggestion(message),
-            'status': cls.extract_status(message),
+            'assignee_name': assignee_name,
+            'assignee_question': assignee_question,
+            'is_priority_query': PRIORITY_REGEX.search(text) is not None,
+            'is_task_suggestion': TASK_SUGGESTION_REGEX.search(text) is not None,
+            'status': cls._status(text),
+            'search_term': cls._search_term(text),
             'original_message': message
         }
 
@@ -134,22 +276,53 @@ class IssueQueryService:
     """Service for querying issues from database"""
     
     @staticmethod
-    def query_by_assignee(assignee_name: str) -> List[Dict]:
-        """Query issues assigned to a specific person"""
+    def _ranked(query, active_first: bool = True) -> Tuple[List[Dict], int]:
+        """The MAX_CONTEXT_ISSUES most relevant issues of ``query`` and its total count.
+        
+        Ranked in SQL by (active first,) priority, then newest, which the
+        status/priority indexes return in order, so only the rows that can
+        reach the prompt are read; llm_context then orders those by due date
+        within each priority. Pass ``active_first=False`` when the query is
+        already limited to one status.
+        """
+        Issue, User, db = ChatbotService.get_models()
+        
+        # Always counted, so a question costs the same statements at any size
+        total = query.count()
+        if not total:
+            return [], 0
+        order = [Issue.priority.desc(), Issue.created_at.desc(), Issue.id.desc()]
+        if active_first:
+            order.insert(0, Issue.status == 'Closed')
+        issues = issue_dicts(query.order_by(*order).limit(MAX_CONTEXT_ISSUES))
+        return issues, total
+    
+    @staticmethod
+    def query_by_assignee(assignee_name: str) -> Tuple[List[Dict], int]:
+        """Most relevant issues assigned to a specific person, and their count"""
         Issue, User, db = ChatbotService.get_models()
         
         try:
-            # Use case-insensitive search with better matching
-            user = User.query.filter(User.name.ilike(f'%{assignee_name}%')).first()
+            # Prefer an exact name, then a prefix, then any substring match
+            user = user_directory.find(assignee_name)
             
             if not user:
                 logger.info(f"User not found: {assignee_name}")
-                return []
+                return [], 0
             
-            issues = Issue.query.filter_by(assignee_id=user.id).all()
-            return [issue.to_dict() for issue in issues]
+            return IssueQueryService._ranked(Issue.query.filter_by(assignee_id=user['id']))
         except Exception as e:
             logger.error(f"Error querying by assignee: {e}")
+            return [], 0
+    
+    @staticmethod
+    def query_search(term: str) -> List[Dict]:
+        """Query issues matching a free-text term, best match first"""
+        try:
+            issues = search.search_issues(term, limit=MAX_ISSUES_LIMIT)
+            return [issue.to_dict() for issue in issues]
+        except Exception as e:
+            logger.error(f"Error searching issues: {e}")
             return []
     
     @staticmethod
@@ -158,58 +331,43 @@ class IssueQueryService:
         Issue, User, db = ChatbotService.get_models()
         
         try:
-            high_priority = Issue.query.filter(
-                Issue.priority == 'High',
+            # priority is stored as an ordinal, so DESC puts High before Medium
+            return issue_dicts(Issue.query.filter(
+                Issue.priority.in_(['High', 'Medium']),
                 Issue.status != 'Closed'
-            ).order_by(Issue.created_at.desc()).limit(MAX_ISSUES_LIMIT).all()
-            
-            all_issues = list(high_priority)
-            
-            if len(high_priority) < MAX_ISSUES_LIMIT:
-                medium_priority = Issue.query.filter(
-                    Issue.priority == 'Medium',
-                    Issue.status != 'Closed'
-                ).order_by(Issue.created_at.desc()).limit(MAX_ISSUES_LIMIT - len(high_priority)).all()
-                all_issues.extend(medium_priority)
-            
-            return [issue.to_dict() for issue in all_issues]
+            ).order_by(
+                Issue.priority.desc(),
+                Issue.created_at.desc()
+            ).limit(MAX_ISSUES_LIMIT))
         except Exception as e:
             logger.error(f"Error querying priority issues: {e}")
             return []
     
     @staticmethod
-    def query_by_status(status: str) -> List[Dict]:
-        """Query issues by status"""
+    def query_by_status(status: str) -> Tuple[List[Dict], int]:
+        """Most relevant issues with a status, and their count"""
         Issue, User, db = ChatbotService.get_models()
         
         try:
-            issues = Issue.query.filter_by(status=status).order_by(Issue.created_at.desc()).all()
-            return [issue.to_dict() for issue in issues]
+            return IssueQueryService._ranked(Issue.query.filter_by(status=status), active_first=False)
         except Exception as e:
             logger.error(f"Error querying by status: {e}")
-            return []
+            return [], 0
     
     @staticmethod
-    def query_suggested_task() -> Optional[Dict]:
+    def query_suggested_task(assignee_name: Optional[str] = None) -> Optional[Dict]:
         """Query best task suggestion (Open, ordered by priority and due date)"""
-        Issue, User, db = ChatbotService.get_models()
-        
         try:
-            open_issues = Issue.query.filter_by(status='Open').all()
-            
-            if not open_issues:
-                return None
-            
-            # Sort by priority (desc) then due_date (asc)
-            sorted_issues = sorted(
-                open_issues,
-                key=lambda issue: (
-                    -PRIORITY_ORDER.get(issue.priority, 0),
-                    issue.due_date if issue.due_date else datetime.max
-                )
-            )
+            assignee_id = None
+            if assignee_name:
+                user = user_directory.find(assignee_name)
+                if not user:
+                    logger.info(f"User not found: {assignee_name}")
+                    return None
+                assignee_id = user['id']
             
-            return sorted_issues[0].to_dict() if sorted_issues else None
+            tasks = suggestions.next_best_tasks(limit=1, assignee_id=assignee_id)
+            return tasks[0].to_dict() if tasks else None
         except Exception as e:
             logger.error(f"Error querying suggested task: {e}")
             return None
@@ -220,14 +378,14 @@ class IssueQueryService:
         Issue, User, db = ChatbotService.get_models()
         
         try:
-            issues = Issue.query.filter(
-                or_(Issue.status == 'Open', Issue.status == 'In-Progress')
+            # Scans ix_issue_priority_created_at in order and stops at the
+            # LIMIT; an IN on status would pick the status index plus a sort
+            return issue_dicts(Issue.query.filter(
+                Issue.status != 'Closed'
             ).order_by(
                 Issue.priority.desc(),
                 Issue.created_at.desc()
-            ).limit(MAX_ISSUES_LIMIT).all()
-            
-            return [issue.to_dict() for issue in issues]
+            ).limit(MAX_ISSUES_LIMIT))
         except Exception as e:
             logger.error(f"Error querying active issues: {e}")
             return []
@@ -315,14 +473,13 @@ Format your response in a natural, conversational way.
 If there are no issues, politely inform the user."""
     
     @staticmethod
-    def generate_response(
-        client,
+    def build_messages(
         user_message: str,
         query_context: str,
         issues_text: str,
         is_task_suggestion: bool
-    ) -> str:
-        """Generate LLM response"""
+    ) -> List[Dict[str, str]]:
+        """Build the chat messages sent to the model"""
         system_prompt = LLMService.get_system_prompt(is_task_suggestion)
         
         user_prompt = f"""User asked: "{user_message}"
@@ -335,20 +492,61 @@ Here are the relevant issues from the database:
 
 Please provide a natural, conversational response to the user's question based on this data."""
         
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+    
+    @staticmethod
+    def generate_response(
+        client,
+        user_message: str,
+        query_context: str,
+        issues_text: str,
+        is_task_suggestion: bool
+    ) -> str:
+        """Generate LLM response"""
+        messages = LLMService.build_messages(user_message, query_context, issues_text, is_task_suggestion)
         try:
-            response = client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.7,
-                max_tokens=MAX_RESPONSE_TOKENS
-            )
+            with metrics.time_openai('completion'):
+                response = client.chat.completions.create(
+                    model=LLM_MODEL,
+                    messages=messages,
+                    temperature=0.7,
+                    max_tokens=MAX_RESPONSE_TOKENS
+                )
             return response.choices[0].message.content
         except Exception as e:
             logger.error(f"Error generating LLM response: {e}")
             raise
+    
+    @staticmethod
+    def stream_response(
+        client,
+        user_message: str,
+        query_context: str,
+        issues_text: str,
+        is_task_suggestion: bool
+    ) -> Iterator[str]:
+        """Generate LLM response, yielding text deltas as they arrive"""
+        messages = LLMService.build_messages(user_message, query_context, issues_text, is_task_suggestion)
+        try:
+            # Timed until the last token
+            with metrics.time_openai('stream'):
+                stream = client.chat.completions.create(
+                    model=LLM_MODEL,
+                    messages=messages,
+                    temperature=0.7,
+                    max_tokens=MAX_RESPONSE_TOKENS,
+                    stream=True
+                )
+                with stream:
+                    for chunk in stream:
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            yield chunk.choices[0].delta.content
+        except Exception as e:
+            logger.error(f"Error streaming LLM response: {e}")
+            raise
 
 
 # Routes
@@ -358,78 +556,171 @@ def chat_page():
     return render_template('chatbot.html')
 
 
+def _chat_message() -> str:
+    """Validated message from the request body; raises ValueError"""
+    data = request.get_json(silent=True) or {}
+    user_message = (data.get('message') or '').strip()
+    
+    if not user_message:
+        raise ValueError('Message is required')
+    
+    # Validate message length
+    if len(user_message) > 500:
+        raise ValueError('Message too long (max 500 characters)')
+    return user_message
+
+
+def _chat_context(user_message: str) -> Dict[str, Any]:
+    """Parse the message and query the database for the matching issues"""
+    parsed = MessageParser.parse(user_message)
+    
+    # Query database based on parsed intent; ``total`` is the number of
+    # matching issues when only the most relevant ones were fetched
+    issues_data = []
+    total = None
+    query_context = ""
+    suggested_task = None
+    
+    # Normalized intent; two messages with the same intent and the same
+    # issue data share a cached LLM response, so it must capture everything
+    # the answer depends on besides the issues
+    if parsed['is_task_suggestion']:
+        intent = ['task_suggestion', (parsed['assignee_name'] or '').casefold()]
+        suggested_task = IssueQueryService.query_suggested_task(parsed['assignee_name'])
+        if suggested_task:
+            issues_data = [suggested_task]
+            query_context = "Found a suggested task based on priority and due date."
+        else:
+            query_context = "No Open issues available to suggest."
+    elif parsed['assignee_name']:
+        intent = ['assignee', parsed['assignee_question'], parsed['assignee_name'].casefold()]
+        issues_data, total = IssueQueryService.query_by_assignee(parsed['assignee_name'])
+        query_context = f"Found {total} issue(s) assigned to {parsed['assignee_name']}."
+    elif parsed['search_term']:
+        intent = ['search', ' '.join(parsed['search_term'].casefold().split())]
+        issues_data = IssueQueryService.query_search(parsed['search_term'])
+        query_context = f"Found {len(issues_data)} issue(s) matching \"{parsed['search_term']}\"."
+    elif parsed['is_priority_query']:
+        intent = ['priority']
+        issues_data = IssueQueryService.query_priority_issues()
+        query_context = f"Found {len(issues_data)} high priority issue(s)."
+    elif parsed['status']:
+        intent = ['status', parsed['status']]
+        issues_data, total = IssueQueryService.query_by_status(parsed['status'])
+        query_context = f"Found {total} {parsed['status']} issue(s)."
+    else:
+        # No pattern matched, so the question itself is the intent: the
+        # same active issues answer "hello" and "which issues are overdue?"
+        intent = ['active', ' '.join(user_message.casefold().split())]
+        issues_data = IssueQueryService.query_active_issues()
+        query_context = f"Found {len(issues_data)} active issue(s)."
+    
+    # Format issues for LLM: ranked (search hits keep their order), compact
+    # and cut to the token budget
+    config = current_app.config
+    issues_text, context_stats = llm_context.build_context(
+        issues_data,
+        ResponseFormatter.format_issues_for_llm,
+        token_budget=config.get('LLM_CONTEXT_TOKEN_BUDGET', llm_context.DEFAULT_TOKEN_BUDGET),
+        description_chars=config.get('LLM_CONTEXT_DESCRIPTION_CHARS', llm_context.DEFAULT_DESCRIPTION_CHARS),
+        rank=intent[0] != 'search',
+        compact=config.get('LLM_CONTEXT_FORMAT', 'table') == 'table',
+        total=total,
+    )
+    logger.info(
+        f"LLM context: {context_stats['included']}/{context_stats['issues']} issues, "
+        f"{context_stats['tokens']} tokens ({context_stats['tokens_saved']} saved)"
+    )
+    
+    # Hand the connection back to the pool (and end the read transaction)
+    # instead of holding it through the LLM call
+    from extensions import db
+    db.session.close()
+    
+    return {
+        'user_message': user_message,
+        'parsed': parsed,
+        'intent': intent,
+        'issues_data': issues_data,
+        'query_context': query_context,
+        'suggested_task': suggested_task,
+        'issues_text': issues_text,
+        'context_stats': context_stats,
+        'cache_key': make_key(
+            intent, issues_text,
+            LLMService.get_system_prompt(parsed['is_task_suggestion']), LLM_MODEL
+        ),
+    }
+
+
+def _fallback_message(context: Dict[str, Any]) -> str:
+    """Plain formatted answer used when OpenAI is not available"""
+    if context['parsed']['is_task_suggestion']:
+        if context['suggested_task']:
+            return ResponseFormatter.format_simple_task_suggestion(context['suggested_task'])
+        return "I don't have any Open issues to suggest at the moment."
+    if context['issues_data']:
+        return ResponseFormatter.format_simple_issues_list(context['issues_data'], context['query_context'])
+    return f"{context['query_context']} No issues match your query."
+
+
+def _llm_arguments(context: Dict[str, Any]):
+    return (
+        context['user_message'],
+        context['query_context'],
+        context['issues_text'],
+        context['parsed']['is_task_suggestion'],
+    )
+
+
+def _context_headers(context: Dict[str, Any]) -> Dict[str, str]:
+    """Size of the prompt context and tokens saved by the compact builder"""
+    stats = context['context_stats']
+    return {
+        'X-Context-Tokens': str(stats['tokens']),
+        'X-Context-Tokens-Saved': str(stats['tokens_saved']),
+    }
+
+
+def _sse(data: Dict[str, Any], event: Optional[str] = None) -> str:
+    """Format one Server-Sent Event"""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
 @chatbot_bp.route('/chat', methods=['POST'])
 def chat():
     """Main chat endpoint that parses messages and queries the database"""
     try:
-        data = request.json
-        user_message = data.get('message', '').strip()
-        
-        if not user_message:
-            return jsonify({'error': 'Message is required'}), 400
-        
-        # Validate message length
-        if len(user_message) > 500:
-            return jsonify({'error': 'Message too long (max 500 characters)'}), 400
-        
-        # Parse the message
-        parsed = MessageParser.parse(user_message)
-        
-        # Query database based on parsed intent
-        issues_data = []
-        query_context = ""
-        suggested_task = None
-        
-        if parsed['is_task_suggestion']:
-            suggested_task = IssueQueryService.query_suggested_task()
-            if suggested_task:
-                issues_data = [suggested_task]
-                query_context = "Found a suggested task based on priority and due date."
-            else:
-                query_context = "No Open issues available to suggest."
-        elif parsed['assignee_name']:
-            issues_data = IssueQueryService.query_by_assignee(parsed['assignee_name'])
-            query_context = f"Found {len(issues_data)} issue(s) assigned to {parsed['assignee_name']}."
-        elif parsed['is_priority_query']:
-            issues_data = IssueQueryService.query_priority_issues()
-            query_context = f"Found {len(issues_data)} high priority issue(s)."
-        elif parsed['status']:
-            issues_data = IssueQueryService.query_by_status(parsed['status'])
-            query_context = f"Found {len(issues_data)} {parsed['status']} issue(s)."
-        else:
-            issues_data = IssueQueryService.query_active_issues()
-            query_context = f"Found {len(issues_data)} active issue(s)."
-        
-        # Format issues for LLM
-        issues_text = ResponseFormatter.format_issues_for_llm(issues_data)
+        context = _chat_context(_chat_message())
         
         # Get OpenAI client
         openai_client = ChatbotService.get_openai_client()
         
         # If OpenAI is not available, return a simple formatted response
         if not openai_client:
-            if parsed['is_task_suggestion']:
-                if suggested_task:
-                    response_text = ResponseFormatter.format_simple_task_suggestion(suggested_task)
-                    return jsonify({'message': response_text}), 200
-                else:
-                    return jsonify({'message': "I don't have any Open issues to suggest at the moment."}), 200
-            elif issues_data:
-                response_text = ResponseFormatter.format_simple_issues_list(issues_data, query_context)
-                return jsonify({'message': response_text}), 200
-            else:
-                return jsonify({'message': f"{query_context} No issues match your query."}), 200
+            return jsonify({'message': _fallback_message(context)}), 200
+        
+        # Reuse an earlier answer to the same intent over the same issues
+        bot_message = llm_cache.get(context['cache_key'])
+        if bot_message is not None:
+            return jsonify({'message': bot_message}), 200, _context_headers(context)
+        
+        # Answer without the model when this worker's LLM slots stay busy
+        slots = _llm_call_slots()
+        if not slots.acquire(timeout=current_app.config.get('CHAT_LLM_QUEUE_TIMEOUT', 0)):
+            logger.warning("All LLM call slots busy, answering without the model")
+            return jsonify({'message': _fallback_message(context)}), 200
         
         # Generate LLM response
-        bot_message = LLMService.generate_response(
-            openai_client,
-            user_message,
-            query_context,
-            issues_text,
-            parsed['is_task_suggestion']
-        )
+        try:
+            bot_message = LLMService.generate_response(openai_client, *_llm_arguments(context))
+        finally:
+            slots.release()
+        if bot_message:
+            llm_cache.set(context['cache_key'], bot_message)
         
-        return jsonify({'message': bot_message}), 200
+        return jsonify({'message': bot_message}), 200, _context_headers(context)
     
     except ValueError as e:
         logger.warning(f"Validation error: {e}")
@@ -439,6 +730,76 @@ def chat():
         return jsonify({'error': 'An error occurred processing your request'}), 500
 
 
+@chatbot_bp.route('/chat/stream', methods=['POST'])
+def chat_stream():
+    """Chat endpoint streaming the answer as Server-Sent Events.
+    
+    Emits ``data: {"delta": "..."}`` events as text arrives and a final
+    ``event: done`` with the whole message, or ``event: error``. Cached
+    answers and the non-LLM fallback (also used when every LLM slot stays
+    busy) are sent as a single delta right away.
+    Validation errors are returned as JSON with status 400 like /chat.
+    """
+    try:
+        context = _chat_context(_chat_message())
+        openai_client = ChatbotService.get_openai_client()
+        bot_message = (
+            _fallback_message(context) if not openai_client
+            else llm_cache.get(context['cache_key'])
+        )
+        slots = _llm_call_slots()
+        queue_timeout = current_app.config.get('CHAT_LLM_QUEUE_TIMEOUT', 0)
+    except ValueError as e:
+        logger.warning(f"Validation error: {e}")
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Unexpected error in chat stream endpoint: {e}")
+        return jsonify({'error': 'An error occurred processing your request'}), 500
+    
+    def events():
+        if bot_message is not None:
+            yield _sse({'delta': bot_message})
+            yield _sse({'message': bot_message}, event='done')
+            return
+        
+        # Taken inside the generator so the slot is released even when the
+        # client disconnects before the stream starts
+        if not slots.acquire(timeout=queue_timeout):
+            logger.warning("All LLM call slots busy, answering without the model")
+            fallback = _fallback_message(context)
+            yield _sse({'delta': fallback})
+            yield _sse({'message': fallback}, event='done')
+            return
+        
+        parts = []
+        try:
+            for delta in LLMService.stream_response(openai_client, *_llm_arguments(context)):
+                parts.append(delta)
+                yield _sse({'delta': delta})
+        except Exception:
+            yield _sse({'error': 'An error occurred processing your request'}, event='error')
+            return
+        finally:
+            slots.release()
+        
+        message = ''.join(parts)
+        if message:
+            llm_cache.set(context['cache_key'], message)
+        yield _sse({'message': message}, event='done')
+    
+    return Response(events(), mimetype='text/event-stream', headers={
+        **_context_headers(context),
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',  # stop nginx-style proxies from buffering
+    })
+
+
+@chatbot_bp.route('/chat/cache', methods=['GET'])
+def chat_cache_stats():
+    """Hit/miss counters of this worker's LLM response cache"""
+    return jsonify(llm_cache.stats()), 200
+
+
 @chatbot_bp.route('/api/chatbot', methods=['POST'])
 def chatbot():
     """Legacy endpoint - redirects to /chat"""
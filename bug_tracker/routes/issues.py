@@ -1,10 +1,182 @@
-from flask import Blueprint, request, jsonify, render_template
-from datetime import datetime
+from flask import Blueprint, Response, request, jsonify, render_template, url_for, stream_with_context
+from datetime import datetime, timedelta
+from sqlalchemy import DateTime, and_, delete, false, func, insert, or_, select, update
+from sqlalchemy.orm import load_only, lazyload, selectinload
+import base64
+import csv
+import io
+import json
 from extensions import db
-from models import Issue, User
+from models import ISSUE_PRIORITIES, ISSUE_STATUSES, Issue, User
+import search
+import suggestions
+from cache import cached_response
+from serializers import issue_serializer
+from user_directory import user_directory
 
 issues_bp = Blueprint('issues', __name__)
 
+# Pagination limits for list endpoints
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 500
+
+# Longest window the calendar endpoint will serve
+MAX_CALENDAR_DAYS = 93
+
+# Rows fetched per round trip by the streaming export
+EXPORT_BATCH_SIZE = 1000
+
+# Accepted values for issue fields
+ALLOWED_STATUSES = list(ISSUE_STATUSES)
+ALLOWED_PRIORITIES = list(ISSUE_PRIORITIES)
+
+# Largest number of operations accepted by /issues/bulk
+MAX_BULK_OPERATIONS = 1000
+
+
+# Sort orders for GET /issues: (expression, descending) pairs, always ending
+# with a unique column so keyset cursors are unambiguous
+PRIORITY_RANK = Issue.priority_rank
+NO_DUE_DATE = datetime(9999, 12, 31)
+SORT_ORDERS = {
+    'newest': [(Issue.created_at, True), (Issue.id, True)],
+    'oldest': [(Issue.created_at, False), (Issue.id, False)],
+    'due_date': [(func.coalesce(Issue.due_date, NO_DUE_DATE), False), (Issue.id, False)],
+    'priority': [(PRIORITY_RANK, True), (Issue.created_at, True), (Issue.id, True)],
+}
+DEFAULT_SORT = 'newest'
+
+# Above this many matches the total count is reported as capped
+COUNT_CAP = 10000
+
+
+def encode_cursor(values):
+    """Build an opaque keyset cursor from the sort key values of the last row"""
+    values = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, order):
+    """Return the sort key values stored in a cursor, raising ValueError if malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+        if len(values) != len(order):
+            raise ValueError
+        return [
+            datetime.fromisoformat(value) if isinstance(expr.type, DateTime) else value
+            for (expr, _), value in zip(order, values)
+        ]
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+
+def keyset_filter(order, values):
+    """Criterion selecting rows that sort strictly after ``values``"""
+    clauses = []
+    for i, (expr, descending) in enumerate(order):
+        ties = [e == v for (e, _), v in zip(order[:i], values[:i])]
+        clauses.append(and_(*ties, expr < values[i] if descending else expr > values[i]))
+    return or_(*clauses)
+
+
+def count_issues(query):
+    """Count matches, stopping at COUNT_CAP; returns (count, capped)"""
+    capped = query.options(lazyload(Issue.assignee)).with_entities(Issue.id).limit(COUNT_CAP + 1).subquery()
+    count = db.session.query(func.count()).select_from(capped).scalar()
+    return min(count, COUNT_CAP), count > COUNT_CAP
+
+
+def issue_values(data, partial=False):
+    """Validate issue fields from a request body and return column values.
+    
+    With partial=True only the keys present in ``data`` are returned, as for
+    an update; otherwise title and description are required and defaults are
+    filled in. Raises ValueError with a message suitable for the client.
+    """
+    if not isinstance(data, dict):
+        raise ValueError('Issue data must be an object')
+    values = {}
+    
+    # Validate required fields
+    for field in ('title', 'description'):
+        if field in data or not partial:
+            if not data.get(field):
+                raise ValueError(f'{field.capitalize()} is required')
+            values[field] = data[field]
+    
+    if 'status' in data or not partial:
+        status = data.get('status', 'Open')
+        if status not in ALLOWED_STATUSES:
+            raise ValueError(f'Status must be one of: {", ".join(ALLOWED_STATUSES)}')
+        values['status'] = status
+    
+    if 'priority' in data or not partial:
+        priority = data.get('priority', 'Medium')
+        if priority not in ALLOWED_PRIORITIES:
+            raise ValueError(f'Priority must be one of: {", ".join(ALLOWED_PRIORITIES)}')
+        values['priority'] = priority
+    
+    # Handle assignee_id - convert empty string to None
+    if 'assignee_id' in data or not partial:
+        assignee_id = data.get('assignee_id')
+        if assignee_id == '' or assignee_id is None:
+            values['assignee_id'] = None
+        else:
+            try:
+                values['assignee_id'] = int(assignee_id)
+            except (ValueError, TypeError):
+                raise ValueError('Invalid assignee_id')
+    
+    # Handle due_date
+    if 'due_date' in data or not partial:
+        due_date = data.get('due_date')
+        if due_date:
+            try:
+                values['due_date'] = datetime.fromisoformat(due_date)
+            except (ValueError, TypeError):
+                raise ValueError('Invalid due_date, expected ISO 8601')
+        else:
+            values['due_date'] = None
+    
+    return values
+
+
+def parse_limit(value):
+    """Clamp the requested page size to [1, MAX_PAGE_LIMIT]"""
+    if not value:
+        return DEFAULT_PAGE_LIMIT
+    try:
+        return max(1, min(int(value), MAX_PAGE_LIMIT))
+    except ValueError:
+        return DEFAULT_PAGE_LIMIT
+
+
+def parse_fields(value):
+    """Parse a comma separated ``fields`` argument into a tuple of Issue fields"""
+    if not value:
+        return None
+    fields = tuple(dict.fromkeys(f.strip() for f in value.split(',') if f.strip()))
+    unknown = [f for f in fields if f not in Issue.FIELDS]
+    if unknown:
+        raise ValueError(f'Unknown field(s): {", ".join(unknown)}')
+    return fields
+
+
+def column_options(fields):
+    """Query options loading only the columns needed to serialize ``fields``"""
+    if fields is None:
+        return []
+    columns = {'id'}
+    for field in fields:
+        columns.add('assignee_id' if field == 'assignee' else field)
+    options = [load_only(*(getattr(Issue, c) for c in columns))]
+    if 'assignee' not in fields:
+        # Skip the eager user join when the assignee is not serialized
+        options.append(lazyload(Issue.assignee))
+    return options
+
 @issues_bp.route('/')
 def index():
     return render_template('index.html')
@@ -21,23 +193,26 @@ def issue_form():
 def edit_issue_form(issue_id):
     return render_template('issue_form.html', issue_id=issue_id)
 
-@issues_bp.route('/issues', methods=['GET'])
-def get_issues():
-    # Start with base query
-    query = Issue.query
-    
+def filter_issues(query, args):
+    """Apply the title/status/priority/assignee filters shared by the list endpoints"""
     # Filter by title (search)
-    title = request.args.get('title')
+    title = args.get('title')
     if title:
-        query = query.filter(Issue.title.ilike(f'%{title}%'))
+        query = query.filter(search.title_filter(title))
     
     # Filter by status
-    status = request.args.get('status')
+    # (unknown values match nothing rather than failing to bind)
+    status = args.get('status')
     if status:
-        query = query.filter(Issue.status == status)
+        query = query.filter(Issue.status == status if status in ALLOWED_STATUSES else false())
+    
+    # Filter by priority
+    priority = args.get('priority')
+    if priority:
+        query = query.filter(Issue.priority == priority if priority in ALLOWED_PRIORITIES else false())
     
     # Filter by assignee_id
-    assignee_id = request.args.get('assignee_id')
+    assignee_id = args.get('assignee_id')
     if assignee_id:
         try:
             assignee_id = int(assignee_id)
@@ -45,59 +220,199 @@ def get_issues():
         except ValueError:
             pass  # Invalid assignee_id, ignore
     
-    # Filter by assignee name (search in related User)
-    assignee_name = request.args.get('assignee')
+    # Filter by assignee name, resolved to ids by the in-memory directory
+    assignee_name = args.get('assignee')
     if assignee_name:
-        # Use outer join to include issues without assignees if needed
-        query = query.outerjoin(User, Issue.assignee_id == User.id).filter(
-            User.name.ilike(f'%{assignee_name}%')
-        )
+        query = query.filter(Issue.assignee_id.in_(user_directory.ids_matching(assignee_name)))
     
-    # Execute query
-    issues = query.all()
-    return jsonify([issue.to_dict() for issue in issues])
+    return query
 
-@issues_bp.route('/issues', methods=['POST'])
-def create_issue():
-    data = request.json
+@issues_bp.route('/issues', methods=['GET'])
+@cached_response('issue', 'user')
+def get_issues():
+    query = filter_issues(Issue.query, request.args)
     
-    # Validate required fields
-    if not data.get('title'):
-        return jsonify({'error': 'Title is required'}), 400
-    if not data.get('description'):
-        return jsonify({'error': 'Description is required'}), 400
+    sort = request.args.get('sort', DEFAULT_SORT)
+    if sort not in SORT_ORDERS:
+        return jsonify({'error': f'Sort must be one of: {", ".join(SORT_ORDERS)}'}), 400
+    order = SORT_ORDERS[sort]
     
-    # Handle assignee_id - convert empty string to None
-    assignee_id = data.get('assignee_id')
-    if assignee_id == '' or assignee_id is None:
-        assignee_id = None
-    else:
+    try:
+        fields = parse_fields(request.args.get('fields'))
+        cursor = request.args.get('cursor')
+        if cursor:
+            query_after = query.filter(keyset_filter(order, decode_cursor(cursor, order)))
+        else:
+            query_after = query
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # Plain column rows, no ORM instances (see serializers.py). Keyset
+    # pagination: the sort key values are selected after the issue columns
+    # so the last row of the page becomes the next cursor
+    limit = parse_limit(request.args.get('limit'))
+    serializer = issue_serializer(fields)
+    rows = serializer.select(query_after, *(expr for expr, _ in order)).order_by(
+        *(expr.desc() if descending else expr.asc() for expr, descending in order)
+    ).limit(limit + 1).all()
+    
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    response = jsonify(serializer.dicts(rows))
+    if has_more:
+        next_cursor = encode_cursor(rows[-1][len(serializer.columns):])
+        response.headers['X-Next-Cursor'] = next_cursor
+        args = request.args.to_dict()
+        args.pop('count', None)
+        args['cursor'] = next_cursor
+        response.headers['Link'] = f'<{url_for("issues.get_issues", **args)}>; rel="next"'
+    
+    # Counting is opt-in and bounded so it never costs a full scan
+    if request.args.get('count') in ('1', 'true'):
+        total, capped = count_issues(query)
+        response.headers['X-Total-Count'] = str(total)
+        if capped:
+            response.headers['X-Total-Count-Capped'] = 'true'
+    return response
+
+@issues_bp.route('/issues/search', methods=['GET'])
+def search_issues():
+    """Ranked full-text search over issue titles and descriptions"""
+    term = request.args.get('q', '').strip()
+    if not term:
+        return jsonify({'error': 'Search term (q) is required'}), 400
+    try:
+        fields = parse_fields(request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    limit = parse_limit(request.args.get('limit') or search.DEFAULT_SEARCH_LIMIT)
+    issues = search.search_issues(term, limit=limit)
+    return jsonify([issue.to_dict(fields) for issue in issues])
+
+@issues_bp.route('/issues/next', methods=['GET'])
+@cached_response('issue', 'user')
+def next_issues():
+    """Top-k Open issues to work on next, optionally for one assignee"""
+    assignee_id = request.args.get('assignee_id')
+    if assignee_id is not None:
         try:
             assignee_id = int(assignee_id)
-        except (ValueError, TypeError):
-            assignee_id = None
+        except ValueError:
+            return jsonify({'error': 'assignee_id must be an integer'}), 400
+    try:
+        fields = parse_fields(request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
-    # Handle due_date
-    due_date = None
-    if data.get('due_date'):
-        try:
-            due_date = datetime.fromisoformat(data['due_date'])
-        except (ValueError, TypeError):
-            due_date = None
-    
-    issue = Issue(
-        title=data.get('title'),
-        description=data.get('description'),
-        status=data.get('status', 'Open'),
-        priority=data.get('priority', 'Medium'),
-        assignee_id=assignee_id,
-        due_date=due_date
-    )
+    limit = min(parse_limit(request.args.get('limit') or 1), suggestions.MAX_SUGGESTIONS)
+    issues = suggestions.next_best_tasks(limit=limit, assignee_id=assignee_id)
+    return jsonify([issue.to_dict(fields) for issue in issues])
+
+@issues_bp.route('/issues/calendar', methods=['GET'])
+@cached_response('issue', 'user')
+def get_calendar_issues():
+    """Issues due between start and end (inclusive YYYY-MM-DD), grouped by day"""
+    try:
+        start = datetime.strptime(request.args['start'], '%Y-%m-%d')
+        end = datetime.strptime(request.args['end'], '%Y-%m-%d')
+    except KeyError:
+        return jsonify({'error': 'start and end are required'}), 400
+    except ValueError:
+        return jsonify({'error': 'start and end must be dates in YYYY-MM-DD format'}), 400
+    if end < start:
+        return jsonify({'error': 'end must not be before start'}), 400
+    if (end - start).days >= MAX_CALENDAR_DAYS:
+        return jsonify({'error': f'Range must be at most {MAX_CALENDAR_DAYS} days'}), 400
+    
+    # Plain column rows: served by the due_date index, no ORM objects,
+    # no descriptions
+    rows = db.session.query(
+        Issue.id, Issue.title, Issue.status, Issue.priority, Issue.due_date, User.name
+    ).outerjoin(User, Issue.assignee_id == User.id).filter(
+        Issue.due_date >= start,
+        Issue.due_date < end + timedelta(days=1)
+    ).order_by(Issue.due_date, Issue.id).all()
+    
+    days = {}
+    for issue_id, title, status, priority, due_date, assignee in rows:
+        days.setdefault(due_date.date().isoformat(), []).append({
+            'id': issue_id,
+            'title': title,
+            'status': status,
+            'priority': priority,
+            'assignee': assignee
+        })
+    return jsonify({
+        'start': start.date().isoformat(),
+        'end': end.date().isoformat(),
+        'days': days
+    })
+
+def iter_ndjson(issues, fields):
+    for issue in issues:
+        yield json.dumps(issue.to_dict(fields), separators=(',', ':')) + '\n'
+
+def iter_csv(issues, fields):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    fields = fields or Issue.FIELDS
+    writer.writerow(fields)
+    for issue in issues:
+        row = issue.to_dict(fields)
+        if row.get('assignee'):
+            row['assignee'] = row['assignee']['name']
+        writer.writerow(row[field] for field in fields)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+EXPORT_FORMATS = {
+    'ndjson': ('application/x-ndjson', iter_ndjson),
+    'csv': ('text/csv', iter_csv),
+}
+
+@issues_bp.route('/issues/export', methods=['GET'])
+def export_issues():
+    """Stream every issue matching the list filters as NDJSON or CSV"""
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f'Format must be one of: {", ".join(EXPORT_FORMATS)}'}), 400
+    try:
+        fields = parse_fields(request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # yield_per streams rows from a server-side cursor in fixed-size batches
+    # instead of materializing the whole result set. Joined eager loading
+    # cannot be combined with it, so assignees are fetched once per batch.
+    options = column_options(fields)
+    if fields is None or 'assignee' in fields:
+        options.append(selectinload(Issue.assignee))
+    query = filter_issues(select(Issue), request.args).options(
+        *options
+    ).order_by(Issue.id).execution_options(yield_per=EXPORT_BATCH_SIZE)
+    
+    mimetype, generate = EXPORT_FORMATS[export_format]
+    issues = db.session.scalars(query)
+    response = Response(stream_with_context(generate(issues, fields)), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename=issues.{export_format}'
+    return response
+
+@issues_bp.route('/issues', methods=['POST'])
+def create_issue():
+    try:
+        values = issue_values(request.json)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    issue = Issue(**values)
     db.session.add(issue)
     db.session.commit()
     return jsonify(issue.to_dict()), 201
 
 @issues_bp.route('/issues/<int:issue_id>', methods=['GET'])
+@cached_response('issue', 'user')
 def get_issue(issue_id):
     issue = Issue.query.get_or_404(issue_id)
     return jsonify(issue.to_dict())
@@ -105,24 +420,14 @@ def get_issue(issue_id):
 @issues_bp.route('/issues/<int:issue_id>', methods=['PUT'])
 def update_issue(issue_id):
     issue = Issue.query.get_or_404(issue_id)
-    data = request.json
+    try:
+        values = issue_values(request.json, partial=True)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
-    # Update fields if provided
-    if 'title' in data:
-        issue.title = data.get('title')
-    if 'description' in data:
-        issue.description = data.get('description')
-    if 'status' in data:
-        issue.status = data.get('status')
-    if 'priority' in data:
-        issue.priority = data.get('priority')
-    if 'assignee_id' in data:
-        issue.assignee_id = data.get('assignee_id')
-    if 'due_date' in data:
-        if data.get('due_date'):
-            issue.due_date = datetime.fromisoformat(data['due_date'])
-        else:
-            issue.due_date = None
+    # Update only the fields provided
+    for field, value in values.items():
+        setattr(issue, field, value)
     
     db.session.commit()
     return jsonify(issue.to_dict())
@@ -145,24 +450,116 @@ def update_issue_status(issue_id):
         return jsonify({'error': 'Status is required'}), 400
     
     # Validate status is one of the allowed values
-    allowed_statuses = ['Open', 'In-Progress', 'Closed']
-    if new_status not in allowed_statuses:
-        return jsonify({'error': f'Status must be one of: {", ".join(allowed_statuses)}'}), 400
+    if new_status not in ALLOWED_STATUSES:
+        return jsonify({'error': f'Status must be one of: {", ".join(ALLOWED_STATUSES)}'}), 400
     
     issue.status = new_status
     db.session.commit()
     return jsonify(issue.to_dict())
 
+@issues_bp.route('/issues/bulk', methods=['POST'])
+def bulk_issues():
+    """Apply many create/update/delete operations in one transaction.
+    
+    The body is a list of operations such as
+    {"op": "create", "title": ..., "description": ...},
+    {"op": "update", "id": 7, "priority": "High"} or {"op": "delete", "id": 9}.
+    Every operation is validated first; if any fails nothing is written and
+    the errors are reported per item.
+    """
+    operations = request.json
+    if not isinstance(operations, list) or not operations:
+        return jsonify({'error': 'Body must be a non-empty list of operations'}), 400
+    if len(operations) > MAX_BULK_OPERATIONS:
+        return jsonify({'error': f'At most {MAX_BULK_OPERATIONS} operations per request'}), 400
+    
+    errors = []
+    creates, updates, deletes = [], [], []
+    for index, operation in enumerate(operations):
+        try:
+            if not isinstance(operation, dict):
+                raise ValueError('Operation must be an object')
+            data = dict(operation)
+            op = data.pop('op', None)
+            if op == 'create':
+                creates.append((index, issue_values(data)))
+            elif op in ('update', 'delete'):
+                issue_id = data.pop('id', None)
+                if not isinstance(issue_id, int) or isinstance(issue_id, bool):
+                    raise ValueError('id must be an integer')
+                if op == 'update':
+                    values = issue_values(data, partial=True)
+                    if not values:
+                        raise ValueError('No fields to update')
+                    updates.append((index, dict(values, id=issue_id)))
+                else:
+                    deletes.append((index, issue_id))
+            else:
+                raise ValueError("op must be one of: create, update, delete")
+        except ValueError as e:
+            errors.append({'index': index, 'error': str(e)})
+    
+    # Check referenced issues and assignees exist with one query each
+    issue_ids = {values['id'] for _, values in updates} | {issue_id for _, issue_id in deletes}
+    existing_issues = set(db.session.scalars(
+        select(Issue.id).where(Issue.id.in_(issue_ids))
+    )) if issue_ids else set()
+    assignee_ids = {
+        values['assignee_id'] for _, values in creates + updates
+        if values.get('assignee_id') is not None
+    }
+    existing_users = set(db.session.scalars(
+        select(User.id).where(User.id.in_(assignee_ids))
+    )) if assignee_ids else set()
+    for index, values in creates + updates:
+        if 'id' in values and values['id'] not in existing_issues:
+            errors.append({'index': index, 'error': f'Issue {values["id"]} not found'})
+        elif values.get('assignee_id') is not None and values['assignee_id'] not in existing_users:
+            errors.append({'index': index, 'error': f'User {values["assignee_id"]} not found'})
+    for index, issue_id in deletes:
+        if issue_id not in existing_issues:
+            errors.append({'index': index, 'error': f'Issue {issue_id} not found'})
+    
+    if errors:
+        errors.sort(key=lambda error: error['index'])
+        return jsonify({'errors': errors}), 400
+    
+    # executemany-style statements, one commit for the whole batch
+    try:
+        created_ids = []
+        if creates:
+            created_ids = list(db.session.scalars(
+                insert(Issue).returning(Issue.id, sort_by_parameter_order=True),
+                [values for _, values in creates]
+            ))
+        if updates:
+            db.session.execute(update(Issue), [values for _, values in updates])
+        if deletes:
+            db.session.execute(
+                delete(Issue).where(Issue.id.in_([issue_id for _, issue_id in deletes])),
+                execution_options={'synchronize_session': False}
+            )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    
+    return jsonify({
+        'created': created_ids,
+        'updated': len(updates),
+        'deleted': len(deletes)
+    }), 200
+
 # User routes
 @issues_bp.route('/users', methods=['GET'])
-def get_users():
-    users = User.query.all()
-    return jsonify([user.to_dict() for user in users])
-
 @issues_bp.route('/api/users', methods=['GET'])
-def get_api_users():
-    users = User.query.all()
-    return jsonify([user.to_dict() for user in users])
+@cached_response('user')
+def get_users():
+    # Optional case-insensitive name search: exact, prefix, then substring
+    term = request.args.get('q')
+    if term:
+        return jsonify(user_directory.search(term))
+    return jsonify(user_directory.all())
 
 @issues_bp.route('/users', methods=['POST'])
 def create_user():
@@ -175,7 +572,7 @@ def create_user():
         return jsonify({'error': 'Role is required'}), 400
     
     # Check if user with same name already exists
-    existing_user = User.query.filter_by(name=data.get('name')).first()
+    existing_user = user_directory.get_by_name(data.get('name'))
     if existing_user:
         return jsonify({'error': 'User with this name already exists'}), 400
     
@@ -185,6 +582,7 @@ def create_user():
     )
     db.session.add(new_user)
     db.session.commit()
+    user_directory.add(new_user)
     return jsonify(new_user.to_dict()), 201
 
 @issues_bp.route('/users/<int:user_id>', methods=['DELETE'])
@@ -207,6 +605,7 @@ def delete_user(user_id):
     
     db.session.delete(user)
     db.session.commit()
+    user_directory.remove(user_id)
     return jsonify({'message': 'User deleted successfully'}), 200
 
 @issues_bp.route('/users/new')
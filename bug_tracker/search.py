@@ -0,0 +1,202 @@
+"""
+Issue search.
+
+One API for the REST endpoints and the chatbot, backed by whatever the
+database offers:
+
+- PostgreSQL: a pg_trgm GIN index makes the title ILIKE filter an index scan,
+  and a weighted tsvector GIN index provides ranked full-text search.
+- SQLite: an FTS5 table with the trigram tokenizer (kept in sync by triggers)
+  serves both substring filters and bm25-ranked search.
+- Anything else, or a term too short for trigrams: plain ILIKE.
+
+The indexes and the FTS table are created by migrations.upgrade(). Assignee
+names are matched in memory by user_directory.
+"""
+import logging
+from typing import List
+from sqlalchemy import inspect, literal_column, or_, select, text
+from extensions import db
+
+logger = logging.getLogger(__name__)
+
+# Trigram indexes cannot serve terms shorter than this
+MIN_TRIGRAM_LENGTH = 3
+DEFAULT_SEARCH_LIMIT = 20
+
+# Terms containing these need an escaped LIKE pattern
+LIKE_SPECIAL_CHARS = ('%', '_', '\\')
+
+# Title matches count more than description matches in the ranking
+TSVECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+)
+
+# Backend name per engine, detected once
+_backends = {}
+
+
+def install(conn):
+    """Create the search indexes for the connected database (idempotent)"""
+    _backends.clear()
+    dialect = conn.dialect.name
+    if dialect == 'postgresql':
+        conn.execute(text('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+        conn.execute(text(
+            'CREATE INDEX IF NOT EXISTS ix_issue_title_trgm '
+            'ON issue USING gin (title gin_trgm_ops)'
+        ))
+        conn.execute(text(
+            'CREATE INDEX IF NOT EXISTS ix_user_name_trgm '
+            'ON "user" USING gin (name gin_trgm_ops)'
+        ))
+        conn.execute(text(
+            f'CREATE INDEX IF NOT EXISTS ix_issue_search_tsv ON issue USING gin (({TSVECTOR_SQL}))'
+        ))
+    elif dialect == 'sqlite':
+        created = 'issue_fts' not in inspect(conn).get_table_names()
+        if created:
+            try:
+                conn.execute(text(
+                    "CREATE VIRTUAL TABLE issue_fts USING fts5("
+                    "title, description, content='issue', content_rowid='id', tokenize='trigram')"
+                ))
+            except Exception as e:
+                logger.warning(f"FTS5 trigram search unavailable, falling back to LIKE: {e}")
+                return
+        # Triggers go with the issue table, so a rebuilt table needs them again
+        conn.execute(text(
+            "CREATE TRIGGER IF NOT EXISTS issue_fts_ai AFTER INSERT ON issue BEGIN "
+            "INSERT INTO issue_fts(rowid, title, description) "
+            "VALUES (new.id, new.title, new.description); END"
+        ))
+        conn.execute(text(
+            "CREATE TRIGGER IF NOT EXISTS issue_fts_ad AFTER DELETE ON issue BEGIN "
+            "INSERT INTO issue_fts(issue_fts, rowid, title, description) "
+            "VALUES ('delete', old.id, old.title, old.description); END"
+        ))
+        conn.execute(text(
+            "CREATE TRIGGER IF NOT EXISTS issue_fts_au AFTER UPDATE OF title, description ON issue BEGIN "
+            "INSERT INTO issue_fts(issue_fts, rowid, title, description) "
+            "VALUES ('delete', old.id, old.title, old.description); "
+            "INSERT INTO issue_fts(rowid, title, description) "
+            "VALUES (new.id, new.title, new.description); END"
+        ))
+        if created:
+            conn.execute(text("INSERT INTO issue_fts(issue_fts) VALUES ('rebuild')"))
+
+
+def uninstall(conn):
+    """Drop the issue search indexes (and on SQLite the FTS table and triggers).
+
+    Searches fall back to plain ILIKE until install() runs again.
+    """
+    _backends.clear()
+    dialect = conn.dialect.name
+    if dialect == 'postgresql':
+        for name in ('ix_issue_title_trgm', 'ix_issue_search_tsv'):
+            conn.execute(text(f'DROP INDEX IF EXISTS {name}'))
+    elif dialect == 'sqlite':
+        for name in ('issue_fts_ai', 'issue_fts_ad', 'issue_fts_au'):
+            conn.execute(text(f'DROP TRIGGER IF EXISTS {name}'))
+        conn.execute(text('DROP TABLE IF EXISTS issue_fts'))
+
+
+def backend():
+    """Return 'postgresql', 'fts5' or 'like' for the current engine"""
+    engine = db.engine
+    name = _backends.get(engine)
+    if name is None:
+        name = engine.dialect.name
+        if name == 'sqlite':
+            with engine.connect() as conn:
+                has_fts = 'issue_fts' in inspect(conn).get_table_names()
+            name = 'fts5' if has_fts else 'like'
+        elif name != 'postgresql':
+            name = 'like'
+        _backends[engine] = name
+    return name
+
+
+def _like_pattern(term: str) -> str:
+    escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escaped}%'
+
+
+def _fts_phrase(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+def title_filter(term: str):
+    """Criterion matching issues whose title contains ``term`` (case-insensitive)"""
+    from models import Issue
+
+    # The trigram index only serves a bare LIKE: with an ESCAPE clause SQLite
+    # scans the whole FTS table, slower than ILIKE on the issue table
+    if (backend() == 'fts5' and len(term) >= MIN_TRIGRAM_LENGTH
+            and not any(c in term for c in LIKE_SPECIAL_CHARS)):
+        matches = select(literal_column('issue_fts.rowid')).select_from(text('issue_fts')).where(
+            literal_column('issue_fts.title').like(f'%{term}%')
+        )
+        return Issue.id.in_(matches)
+    # On PostgreSQL the trigram index on title serves this ILIKE directly
+    return Issue.title.ilike(_like_pattern(term), escape='\\')
+
+
+def _ranked_ids_postgresql(term: str, limit: int) -> List[int]:
+    rows = db.session.execute(text(
+        f"SELECT id FROM issue, websearch_to_tsquery('english', :term) AS q "
+        f"WHERE ({TSVECTOR_SQL}) @@ q OR title ILIKE :pattern "
+        f"ORDER BY ts_rank_cd({TSVECTOR_SQL}, q) + similarity(title, :term) DESC, id DESC "
+        f"LIMIT :limit"
+    ), {'term': term, 'pattern': _like_pattern(term), 'limit': limit})
+    return [row[0] for row in rows]
+
+
+def _ranked_ids_fts5(term: str, limit: int) -> List[int]:
+    words = [w for w in term.split() if len(w) >= MIN_TRIGRAM_LENGTH]
+    if not words:
+        return _ranked_ids_like(term, limit)
+    # Any word may match; bm25 ranks issues matching more (and rarer) words
+    # first, with title hits weighted ten times description hits
+    match = ' OR '.join(_fts_phrase(w) for w in words)
+    rows = db.session.execute(text(
+        "SELECT rowid FROM issue_fts WHERE issue_fts MATCH :match "
+        "ORDER BY bm25(issue_fts, 10.0, 1.0), rowid DESC LIMIT :limit"
+    ), {'match': match, 'limit': limit})
+    return [row[0] for row in rows]
+
+
+def _ranked_ids_like(term: str, limit: int) -> List[int]:
+    from models import Issue
+
+    pattern = _like_pattern(term)
+    in_title = Issue.title.ilike(pattern, escape='\\')
+    rows = db.session.execute(
+        select(Issue.id).where(
+            or_(in_title, Issue.description.ilike(pattern, escape='\\'))
+        ).order_by(in_title.desc(), Issue.id.desc()).limit(limit)
+    )
+    return [row[0] for row in rows]
+
+
+_RANKERS = {
+    'postgresql': _ranked_ids_postgresql,
+    'fts5': _ranked_ids_fts5,
+    'like': _ranked_ids_like,
+}
+
+
+def search_issues(term: str, limit: int = DEFAULT_SEARCH_LIMIT) -> List:
+    """Return issues matching ``term`` in title or description, best match first"""
+    from models import Issue
+
+    term = (term or '').strip()
+    if not term:
+        return []
+    ids = _RANKERS[backend()](term, limit)
+    if not ids:
+        return []
+    by_id = {issue.id: issue for issue in Issue.query.filter(Issue.id.in_(ids))}
+    return [by_id[i] for i in ids if i in by_id]
@@ -0,0 +1,188 @@
+"""
+Sample users and issues for a fresh database (``flask seed`` / ``flask init-db``).
+
+For production-sized data use ``flask generate-data`` (see synthetic.py).
+"""
+from datetime import datetime, timedelta
+from sqlalchemy import insert, select
+from extensions import db
+
+
+def seed_data():
+    """Seed the database with sample users and issues"""
+    from models import User, Issue
+    
+    try:
+        # Check if data already exists
+        if User.query.first() is not None:
+            return  # Data already seeded
+    except Exception as e:
+        # If query fails, database might not be ready yet
+        import logging
+        logging.warning(f"Could not check for existing data: {e}")
+        return
+    
+    try:
+        # Create sample users in one executemany and read their ids back in
+        # one query; nothing is committed until the issues are in too
+        db.session.execute(insert(User), [
+            {'name': 'Alex', 'role': 'Developer'},
+            {'name': 'Maddy', 'role': 'QA Engineer'},
+            {'name': 'Sarah', 'role': 'Project Manager'},
+            {'name': 'John', 'role': 'Developer'},
+            {'name': 'Emily', 'role': 'Designer'},
+        ])
+        user_ids = dict(db.session.execute(select(User.name, User.id)).all())
+        alex_id, maddy_id, sarah_id, john_id, emily_id = (
+            user_ids[name] for name in ('Alex', 'Maddy', 'Sarah', 'John', 'Emily')
+        )
+    except Exception as e:
+        import logging
+        logging.warning(f"Error creating users: {e}")
+        db.session.rollback()
+        return  # Exit early if user creation fails
+    
+    # Calculate dates for the current week
+    today = datetime.now()
+    # Get Monday of current week (Monday = 0, Sunday = 6)
+    days_since_monday = today.weekday()
+    monday = today.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days_since_monday)
+    
+    # Create sample issues with various statuses, priorities, and due dates
+    issues = [
+        # High priority issues for Alex
+        dict(
+            title='Fix login authentication bug',
+            description='Users are unable to log in with their credentials. Need to investigate and fix the authentication flow.',
+            status='Open',
+            priority='High',
+            assignee_id=alex_id,
+            due_date=monday + timedelta(days=1)  # Tuesday
+        ),
+        dict(
+            title='Implement user profile page',
+            description='Create a new user profile page with edit functionality and avatar upload.',
+            status='In-Progress',
+            priority='High',
+            assignee_id=alex_id,
+            due_date=monday + timedelta(days=3)  # Thursday
+        ),
+        dict(
+            title='Optimize database queries',
+            description='Review and optimize slow database queries in the dashboard endpoint.',
+            status='Open',
+            priority='Medium',
+            assignee_id=alex_id,
+            due_date=monday + timedelta(days=5)  # Saturday
+        ),
+        
+        # Issues for Maddy
+        dict(
+            title='Test payment integration',
+            description='Write comprehensive tests for the new payment integration feature.',
+            status='Open',
+            priority='High',
+            assignee_id=maddy_id,
+            due_date=monday + timedelta(days=2)  # Wednesday
+        ),
+        dict(
+            title='Review pull request #123',
+            description='Review and test the changes in pull request #123 before merging.',
+            status='In-Progress',
+            priority='Medium',
+            assignee_id=maddy_id,
+            due_date=monday + timedelta(days=4)  # Friday
+        ),
+        dict(
+            title='Update test documentation',
+            description='Update the test documentation with new test cases and procedures.',
+            status='Open',
+            priority='Low',
+            assignee_id=maddy_id,
+            due_date=monday + timedelta(days=6)  # Sunday
+        ),
+        
+        # Issues for Sarah
+        dict(
+            title='Plan sprint 15',
+            description='Plan and organize tasks for sprint 15, including backlog grooming.',
+            status='Open',
+            priority='High',
+            assignee_id=sarah_id,
+            due_date=monday  # Monday
+        ),
+        dict(
+            title='Client meeting preparation',
+            description='Prepare presentation and materials for the upcoming client meeting.',
+            status='In-Progress',
+            priority='Medium',
+            assignee_id=sarah_id,
+            due_date=monday + timedelta(days=1)  # Tuesday
+        ),
+        
+        # Issues for John
+        dict(
+            title='Refactor API endpoints',
+            description='Refactor the REST API endpoints to follow best practices and improve maintainability.',
+            status='Open',
+            priority='Medium',
+            assignee_id=john_id,
+            due_date=monday + timedelta(days=2)  # Wednesday
+        ),
+        dict(
+            title='Add error logging',
+            description='Implement comprehensive error logging system for better debugging.',
+            status='Closed',
+            priority='Low',
+            assignee_id=john_id,
+            due_date=monday - timedelta(days=2)  # Past date
+        ),
+        
+        # Issues for Emily
+        dict(
+            title='Design new dashboard UI',
+            description='Create mockups and designs for the new dashboard user interface.',
+            status='Open',
+            priority='High',
+            assignee_id=emily_id,
+            due_date=monday + timedelta(days=3)  # Thursday
+        ),
+        dict(
+            title='Update brand colors',
+            description='Update the application with new brand colors and styling guidelines.',
+            status='In-Progress',
+            priority='Medium',
+            assignee_id=emily_id,
+            due_date=monday + timedelta(days=4)  # Friday
+        ),
+        
+        # Unassigned issues
+        dict(
+            title='Security audit',
+            description='Conduct a comprehensive security audit of the application.',
+            status='Open',
+            priority='High',
+            assignee_id=None,
+            due_date=monday + timedelta(days=1)  # Tuesday
+        ),
+        dict(
+            title='Update dependencies',
+            description='Update all project dependencies to their latest stable versions.',
+            status='Open',
+            priority='Low',
+            assignee_id=None,
+            due_date=monday + timedelta(days=5)  # Saturday
+        ),
+    ]
+    
+    try:
+        # One executemany for all issues, committed with the users
+        db.session.execute(insert(Issue), issues)
+        db.session.commit()
+        import logging
+        logging.info("Sample data seeded successfully!")
+    except Exception as e:
+        import logging
+        logging.warning(f"Error seeding issues: {e}")
+        db.session.rollback()
+        # Don't raise - app should still work without seed data
@@ -0,0 +1,75 @@
+"""
+Issue and user payloads built from plain column rows.
+
+``Issue.to_dict()`` needs a full ORM instance per row: an identity map
+entry, instrumented attribute access and a joined ``User`` instance for the
+assignee. Read-only lists do not need any of that, so they select just the
+columns behind the requested fields and build the same dicts (same keys,
+same order, dates in ISO 8601) straight from the result tuples:
+
+    serializer = issue_serializer(fields)
+    issues = serializer.dicts(serializer.select(query))
+
+The assignee comes from the in-memory user directory (user_directory.py)
+instead of a join, so the SQL selects issue columns only. Serializers are
+cached per field tuple; the per-row work is a dict comprehension over
+precomputed (key, position) pairs.
+"""
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+from models import Issue, User
+from user_directory import user_directory
+
+# Columns of a serialized user, in user_row_dict() order
+USER_COLUMNS = (User.id, User.name, User.role)
+DATETIME_FIELDS = ('created_at', 'due_date')
+
+
+def user_row_dict(row) -> Dict:
+    """{'id', 'name', 'role'} from a row selected with USER_COLUMNS"""
+    return {'id': row[0], 'name': row[1], 'role': row[2]}
+
+
+class IssueRowSerializer:
+    """Issue.to_dict(fields) for rows selected with ``columns``"""
+
+    def __init__(self, fields: Optional[Tuple[str, ...]] = None):
+        self.fields = tuple(fields or Issue.FIELDS)
+        # 'assignee' is read from the assignee_id column
+        self.columns = [Issue.assignee_id if field == 'assignee' else getattr(Issue, field)
+                        for field in self.fields]
+        self._positions = list(zip(self.fields, range(len(self.fields))))
+        self._dates = [(field, position) for field, position in self._positions
+                       if field in DATETIME_FIELDS]
+        self._with_assignee = 'assignee' in self.fields
+
+    def select(self, query, *extra):
+        """``query`` (an Issue query) returning our columns, then ``extra``"""
+        return query.with_entities(*self.columns, *extra)
+
+    def dicts(self, rows: Iterable) -> List[Dict]:
+        users = user_directory.by_id() if self._with_assignee else None
+        positions = self._positions
+        dates = self._dates
+        result = []
+        for row in rows:
+            data = {field: row[position] for field, position in positions}
+            for field, position in dates:
+                value = row[position]
+                if value is not None:
+                    data[field] = value.isoformat()
+            if users is not None and data['assignee'] is not None:
+                data['assignee'] = users.get(data['assignee'])
+            result.append(data)
+        return result
+
+
+@lru_cache(maxsize=64)
+def issue_serializer(fields: Optional[Tuple[str, ...]] = None) -> IssueRowSerializer:
+    return IssueRowSerializer(fields)
+
+
+def issue_dicts(query, fields: Optional[Tuple[str, ...]] = None) -> List[Dict]:
+    """Run an Issue query and serialize the rows as Issue.to_dict(fields) would"""
+    serializer = issue_serializer(fields)
+    return serializer.dicts(serializer.select(query))
@@ -0,0 +1,24 @@
+"""
+"Next best task": which Open issues to work on first.
+
+Ranking happens in the database: priority first (High > Medium > Low), then
+the earliest due date with undated issues last, then the oldest issue. Only
+the requested top ``limit`` rows are fetched, so a suggestion never loads the
+whole backlog. Used by the chatbot's task suggestions and GET /issues/next.
+"""
+from typing import List, Optional
+from models import Issue
+
+MAX_SUGGESTIONS = 50
+
+
+def next_best_tasks(limit: int = 1, assignee_id: Optional[int] = None) -> List[Issue]:
+    """Return up to ``limit`` Open issues, best first, optionally for one assignee"""
+    query = Issue.query.filter(Issue.status == 'Open')
+    if assignee_id is not None:
+        query = query.filter(Issue.assignee_id == assignee_id)
+    return query.order_by(
+        Issue.priority_rank.desc(),
+        Issue.due_date.asc().nulls_last(),
+        Issue.id.asc(),
+    ).limit(limit).all()
@@ -0,0 +1,193 @@
+"""
+Synthetic users and issues at production scale (``flask generate-data``).
+
+Rows are built from seeded random distributions shaped like a real tracker
+and bulk-inserted with executemany in batches, one transaction per batch:
+
+- status: half the issues Closed, the rest Open or In-Progress;
+- priority: mostly Medium, fewer High than Low;
+- assignee: a long tail (a few users own most issues), some unassigned;
+- created_at: spread over the last --days days;
+- due_date: set on most issues, around two weeks after creation;
+- description: log-normal length, from a sentence to a few paragraphs.
+
+The same --seed always produces the same rows, so benchmarks that load their
+fixture with generate() are comparable run to run.
+"""
+import logging
+import math
+import random
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import func, insert, select
+from extensions import db
+import database
+import query_debug
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 20000
+
+STATUS_WEIGHTS = {'Open': 30, 'In-Progress': 20, 'Closed': 50}
+PRIORITY_WEIGHTS = {'High': 20, 'Medium': 50, 'Low': 30}
+ROLE_WEIGHTS = {'Developer': 55, 'QA Engineer': 15, 'Designer': 10,
+                'Project Manager': 10, 'DevOps Engineer': 10}
+UNASSIGNED_RATIO = 0.1
+DUE_DATE_RATIO = 0.8
+
+FIRST_NAMES = (
+    'Alex', 'Maddy', 'Sarah', 'John', 'Emily', 'Liam', 'Olivia', 'Noah', 'Emma', 'Ava',
+    'Mia', 'Lucas', 'Ethan', 'Zoe', 'Chloe', 'Ryan', 'Nina', 'Omar', 'Priya', 'Wei',
+    'Hana', 'Diego', 'Sofia', 'Ivan', 'Lena', 'Kofi', 'Amara', 'Yuki', 'Mateo', 'Aisha',
+)
+TITLE_VERBS = ('Fix', 'Implement', 'Refactor', 'Optimize', 'Investigate', 'Add', 'Remove',
+               'Update', 'Test', 'Document', 'Migrate', 'Review')
+TITLE_SUBJECTS = ('login flow', 'payment integration', 'search results', 'user profile page',
+                  'API endpoints', 'database queries', 'email notifications', 'file upload',
+                  'dashboard charts', 'error logging', 'session handling', 'export to CSV',
+                  'mobile layout', 'rate limiting', 'cache invalidation', 'access control')
+TITLE_QUALIFIERS = ('', '', '', ' on Safari', ' for admins', ' after deploy', ' under load',
+                    ' in staging', ' for large accounts', ' on first visit')
+WORDS = (
+    'the', 'user', 'request', 'fails', 'when', 'page', 'loads', 'after', 'timeout', 'error',
+    'server', 'returns', 'data', 'invalid', 'should', 'display', 'message', 'instead', 'of',
+    'crash', 'steps', 'to', 'reproduce', 'open', 'click', 'submit', 'expected', 'actual',
+    'result', 'slow', 'query', 'missing', 'index', 'needs', 'investigation', 'customer',
+    'reported', 'issue', 'with', 'button', 'form', 'validation', 'mobile', 'browser',
+    'cache', 'stale', 'value', 'config', 'deploy', 'release', 'regression', 'since', 'version',
+)
+
+
+def _weighted(rng: random.Random, weights: Dict[str, int], k: int) -> List[str]:
+    return rng.choices(list(weights), list(weights.values()), k=k)
+
+
+def _corpus(rng: random.Random, size: int = 1 << 16) -> str:
+    """Random prose that descriptions are cut from, instead of built per row"""
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return ' '.join(words)
+
+
+def user_rows(count: int, seed: int = 0) -> List[Dict]:
+    rng = random.Random(seed)
+    roles = _weighted(rng, ROLE_WEIGHTS, count)
+    rows = []
+    for i in range(count):
+        name = FIRST_NAMES[i % len(FIRST_NAMES)]
+        if i >= len(FIRST_NAMES):
+            name = f'{name} {i // len(FIRST_NAMES)}'
+        rows.append({'name': name, 'role': roles[i]})
+    return rows
+
+
+def issue_batches(count: int, assignee_ids: List[int], seed: int = 0,
+                  batch_size: int = BATCH_SIZE, days: int = 365,
+                  now: Optional[datetime] = None):
+    """Yield lists of issue rows, ``batch_size`` at a time"""
+    rng = random.Random(seed + 1)
+    corpus = _corpus(rng)
+    now = now or datetime.utcnow()
+    span = days * 86400
+    # Zipf-like weights: the n-th user gets about 1/n of the first one's issues
+    owner_weights = [1 / (rank + 1) for rank in range(len(assignee_ids))]
+    cumulative = []
+    total = 0.0
+    for weight in owner_weights:
+        total += weight
+        cumulative.append(total)
+
+    for start in range(0, count, batch_size):
+        size = min(batch_size, count - start)
+        statuses = _weighted(rng, STATUS_WEIGHTS, size)
+        priorities = _weighted(rng, PRIORITY_WEIGHTS, size)
+        owners = (rng.choices(assignee_ids, cum_weights=cumulative, k=size)
+                  if assignee_ids else [None] * size)
+        rows = []
+        for i in range(size):
+            created_at = now - timedelta(seconds=rng.random() * span)
+            due_date = None
+            if rng.random() < DUE_DATE_RATIO:
+                due_date = created_at + timedelta(days=max(1, round(rng.gauss(14, 10))))
+            length = min(2000, max(20, int(math.exp(rng.gauss(4.8, 0.7)))))
+            offset = rng.randrange(len(corpus) - length)
+            rows.append({
+                'title': f'{rng.choice(TITLE_VERBS)} {rng.choice(TITLE_SUBJECTS)}'
+                         f'{rng.choice(TITLE_QUALIFIERS)} #{start + i + 1}',
+                'description': corpus[offset:offset + length].strip().capitalize(),
+                'status': statuses[i],
+                'priority': priorities[i],
+                'assignee_id': None if rng.random() < UNASSIGNED_RATIO else owners[i],
+                'created_at': created_at,
+                'due_date': due_date,
+            })
+        yield rows
+
+
+def generate(users: int, issues: int, seed: int = 0, batch_size: int = BATCH_SIZE,
+             days: int = 365, progress: Optional[Callable[[int], None]] = None,
+             search_index: bool = True) -> Dict[str, int]:
+    """Insert ``users`` users and ``issues`` issues; must run in an app context.
+
+    Rows are added to whatever the database already holds. Issues are
+    assigned to the new users, or to the existing ones when ``users`` is 0.
+    When the load is larger than the issue table, the issue indexes and the
+    search index (search.uninstall) are dropped for its duration and built
+    once at the end, which is several times faster than maintaining them
+    row by row. They are rebuilt even when the load fails, but a killed
+    process leaves them missing: any later run, even with no rows to add,
+    creates whatever is missing. Meant for development and benchmark
+    databases, not for a live one.
+
+    ``search_index=False`` leaves the search index out after a bulk load,
+    which skips its build, by far the slowest step; searches then fall back
+    to ILIKE until a run with ``search_index=True``.
+    ``progress`` is called with the number of issues inserted so far.
+    """
+    import search
+    from models import Issue, User
+
+    session = db.session
+    last_user_id = session.scalar(select(func.max(User.id))) or 0
+    if users:
+        session.execute(insert(User), user_rows(users, seed))
+        session.commit()
+    # The new users, or everyone when none were added
+    assignee_ids = list(session.scalars(
+        select(User.id).where(User.id > (last_user_id if users else 0)).order_by(User.id)
+    ))
+
+    conn = session.connection()
+    existing = session.scalar(select(func.count()).select_from(Issue))
+    if issues > existing:
+        search.uninstall(conn)
+        for index in Issue.__table__.indexes:
+            index.drop(conn, checkfirst=True)
+    session.commit()
+
+    inserted = 0
+    try:
+        with query_debug.allow_repeated():
+            for rows in issue_batches(issues, assignee_ids, seed, batch_size, days):
+                # Core executemany: the ORM bulk path splits batches on NULL columns
+                session.execute(Issue.__table__.insert(), rows)
+                session.commit()
+                inserted += len(rows)
+                if progress:
+                    progress(inserted)
+    finally:
+        session.rollback()
+        conn = session.connection()
+        database.disable_statement_timeout(conn)
+        for index in Issue.__table__.indexes:
+            index.create(conn, checkfirst=True)
+        if search_index:
+            search.install(conn)
+        session.commit()
+
+    logger.info(f"Generated {users} users and {inserted} issues")
+    return {'users': users, 'issues': inserted, 'total_issues': existing + inserted}
@@ -0,0 +1,60 @@
+"""
+Shared fixtures: the app on a temporary SQLite database with the sample data.
+
+Config reads the environment when it is first imported, so the database and
+the OpenAI settings are fixed here, before any test imports the app.
+"""
+import os
+import sys
+import tempfile
+import pytest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+os.environ['DATABASE_URL'] = (
+    f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bug-tracker-tests-'), 'test.db')}"
+)
+for name in ('OPENAI_API_KEY', 'OPENAI_BASE_URL', 'SQL_DEBUG', 'LLM_CACHE_PATH'):
+    os.environ.pop(name, None)  # chat answers without the LLM unless a test sets one
+
+
+@pytest.fixture(scope='session')
+def app():
+    import app as app_module
+
+    result = app_module.app.test_cli_runner().invoke(args=['init-db'])
+    assert result.exit_code == 0, result.output
+    return app_module.app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def sample_data(app):
+    """Delete the users and issues a test adds, back to the sample data"""
+    from extensions import db
+    from models import Issue, User
+
+    with app.app_context():
+        last_issue = db.session.scalar(db.select(db.func.max(Issue.id)))
+        last_user = db.session.scalar(db.select(db.func.max(User.id)))
+    yield
+    with app.app_context():
+        db.session.execute(db.delete(Issue).where(Issue.id > last_issue))
+        db.session.execute(db.delete(User).where(User.id > last_user))
+        db.session.commit()
+
+
+@pytest.fixture
+def stub_llm(app, monkeypatch):
+    """The chatbot talking to benchmarks/stub_openai.py instead of OpenAI"""
+    from benchmarks.stub_openai import StubOpenAIServer
+
+    with StubOpenAIServer(reply='stub-llm-answer') as server:
+        monkeypatch.setenv('OPENAI_API_KEY', 'stub-key')
+        monkeypatch.setitem(app.config, 'OPENAI_BASE_URL', server.base_url)
+        yield server
@@ -0,0 +1,38 @@
+"""
+PUT /issues/<id> validation, shared with POST through issue_values().
+"""
+import pytest
+
+
+@pytest.fixture
+def issue(client, sample_data):
+    response = client.post('/issues', json={
+        'title': 'Update me', 'description': 'Created by a test', 'assignee_id': 1,
+        'due_date': '2026-01-15T00:00:00',
+    })
+    assert response.status_code == 201
+    return response.get_json()
+
+
+def test_update_applies_only_the_fields_sent(client, issue):
+    response = client.put(f"/issues/{issue['id']}", json={'status': 'In-Progress', 'assignee_id': '2'})
+    assert response.status_code == 200
+    updated = response.get_json()
+    assert updated['status'] == 'In-Progress'
+    assert updated['assignee_id'] == 2
+    assert (updated['title'], updated['priority'], updated['due_date']) == (
+        issue['title'], issue['priority'], issue['due_date'])
+
+
+@pytest.mark.parametrize('body, error', [
+    ({'assignee_id': 'abc'}, 'Invalid assignee_id'),
+    ({'due_date': 'next tuesday'}, 'Invalid due_date, expected ISO 8601'),
+    ({'status': 'Done'}, 'Status must be one of: Open, In-Progress, Closed'),
+    ({'priority': 'Urgent'}, 'Priority must be one of: Low, Medium, High'),
+    ({'title': ''}, 'Title is required'),
+])
+def test_invalid_update_is_rejected(client, issue, body, error):
+    response = client.put(f"/issues/{issue['id']}", json=body)
+    assert response.status_code == 400
+    assert response.get_json() == {'error': error}
+    assert client.get(f"/issues/{issue['id']}").get_json() == issue
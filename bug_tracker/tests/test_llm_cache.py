@@ -0,0 +1,36 @@
+"""
+Chatbot LLM response cache keys, against the local stub server: only
+messages asking the same question over the same issues share an answer.
+"""
+import pytest
+from cache import ResponseCache
+from llm_cache import llm_cache
+
+
+@pytest.fixture
+def stub(stub_llm, monkeypatch):
+    monkeypatch.setattr(llm_cache, 'store', ResponseCache())
+    return stub_llm
+
+
+def _ask(client, *messages):
+    for message in messages:
+        response = client.post('/chat', json={'message': message})
+        assert response.status_code == 200
+
+
+def test_unmatched_messages_are_cached_by_text(client, stub):
+    _ask(client, 'hello', 'which issues are overdue?', 'how many bugs did John close?')
+    assert stub.requests == 3
+
+    # Case and spacing do not make a new question
+    _ask(client, 'Hello', '  which issues   are OVERDUE? ')
+    assert stub.requests == 3
+
+
+def test_who_is_differs_from_working_on(client, stub):
+    _ask(client, 'what is alex working on', 'who is alex')
+    assert stub.requests == 2
+
+    _ask(client, "alex's tasks")
+    assert stub.requests == 2
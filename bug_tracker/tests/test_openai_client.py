@@ -0,0 +1,36 @@
+"""
+The chatbot's shared OpenAI client, against the local stub server
+(benchmarks/stub_openai.py) instead of the API.
+"""
+import pytest
+from cache import ResponseCache
+from llm_cache import llm_cache
+from routes import chatbot
+from routes.chatbot import ChatbotService
+
+
+@pytest.fixture
+def stub(stub_llm, monkeypatch):
+    # Every message must reach the "model"
+    monkeypatch.setattr(llm_cache, 'store', ResponseCache(max_size=0))
+    return stub_llm
+
+
+def test_chat_requests_share_one_connection(client, stub):
+    for _ in range(5):
+        response = client.post('/chat', json={'message': 'show me open issues'})
+        assert response.get_json() == {'message': 'stub-llm-answer'}
+
+    assert stub.requests == 5
+    # No client, pool or TLS setup per request: one kept-alive connection
+    assert stub.connections == 1
+
+
+def test_client_is_built_once_per_process(app, stub, monkeypatch):
+    with app.app_context():
+        client = ChatbotService.get_openai_client()
+        assert ChatbotService.get_openai_client() is client
+
+        # A forked gunicorn worker must not reuse its parent's connections
+        monkeypatch.setattr(chatbot.os, 'getpid', lambda: -1)
+        assert ChatbotService.get_openai_client() is not client
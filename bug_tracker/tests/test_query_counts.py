@@ -0,0 +1,50 @@
+"""
+Query-count regression tests: the issue list and the chatbot run the same
+number of SQL statements however many issues and users there are.
+"""
+import pytest
+import synthetic
+from query_debug import assert_constant_queries
+
+LIST_URLS = [
+    '/issues',
+    '/issues?sort=priority&limit=200',
+    '/issues?fields=id,title,assignee',
+    '/issues?status=Open&assignee=alex',
+    '/users',
+]
+
+# One message per IssueQueryService path
+CHAT_MESSAGES = [
+    'what is alex working on',    # query_by_assignee
+    'show me open issues',        # query_by_status
+    'top priority tasks',         # query_priority_issues
+    'find issues about login',    # query_search
+    'suggest a task for me',      # query_suggested_task
+    'hello',                      # query_active_issues
+]
+
+
+def _grow(app):
+    def grow_data():
+        with app.app_context():
+            synthetic.generate(30, 300, days=30)
+    return grow_data
+
+
+@pytest.mark.parametrize('url', LIST_URLS)
+def test_list_queries_are_constant(app, client, sample_data, url):
+    def send_request():
+        response = client.get(url)
+        assert response.status_code == 200
+
+    assert_constant_queries(send_request, _grow(app), f'GET {url}')
+
+
+@pytest.mark.parametrize('message', CHAT_MESSAGES)
+def test_chat_queries_are_constant(app, client, sample_data, message):
+    def send_request():
+        response = client.post('/chat', json={'message': message})
+        assert response.status_code == 200
+
+    assert_constant_queries(send_request, _grow(app), f'POST /chat {message!r}')
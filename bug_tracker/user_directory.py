@@ -0,0 +1,147 @@
+"""
+In-process directory of users with a case-insensitive name index.
+
+The users table is small and read on almost every page, by the chatbot and by
+the assignee filter of the issue list, so each worker keeps it in memory.
+Freshness is checked against the ``user`` counter in ``data_version`` (see
+cache.py): one primary-key lookup per request, memoized for the request,
+decides whether the directory must be reloaded because some worker changed a
+user. Writes made by this worker are applied to a copy by create_user and
+delete_user, then swapped in.
+"""
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Optional
+from sqlalchemy import select
+from cache import current_versions
+
+
+class UserDirectory:
+    """Users by id plus a sorted (casefolded name, id) index.
+
+    The state is one immutable ``(users, names, version)`` snapshot: writers
+    build new objects under the lock and swap the tuple, readers take the
+    snapshot once and never see a half-applied change.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = ({}, [], None)
+
+    # Loading and freshness
+
+    def _database_version(self) -> int:
+        return current_versions(('user',))['user']
+
+    def _load(self, version):
+        from extensions import db
+        from serializers import USER_COLUMNS, user_row_dict
+
+        rows = db.session.execute(select(*USER_COLUMNS))
+        users = {row[0]: user_row_dict(row) for row in rows}
+        names = sorted((u['name'].casefold(), u['id']) for u in users.values())
+        self._state = (users, names, version)
+
+    def _fresh(self):
+        """The current snapshot, reloaded first if another worker changed users"""
+        version = self._database_version()
+        if version != self._state[2]:
+            with self._lock:
+                if version != self._state[2]:
+                    self._load(version)
+        return self._state
+
+    def invalidate(self):
+        with self._lock:
+            users, names, _ = self._state
+            self._state = (users, names, None)
+
+    # Writes from this worker; call after the commit
+
+    def _apply(self, change):
+        previous = self._state[2]
+        version = self._database_version()
+        with self._lock:
+            users, names, current = self._state
+            if previous is not None and current == previous and version == previous + 1:
+                # Ours is the only write since the last load: patch copies
+                users, names = change(dict(users), list(names))
+                self._state = (users, names, version)
+            else:
+                self._state = (users, names, None)
+
+    def add(self, user):
+        data = user.to_dict()
+        entry = (data['name'].casefold(), data['id'])
+
+        def change(users, names):
+            users[data['id']] = data
+            names.insert(bisect_left(names, entry), entry)
+            return users, names
+        self._apply(change)
+
+    def remove(self, user_id: int):
+        def change(users, names):
+            data = users.pop(user_id, None)
+            if data is not None:
+                names.remove((data['name'].casefold(), user_id))
+            return users, names
+        self._apply(change)
+
+    # Lookups
+
+    def all(self) -> List[Dict]:
+        """Every user as a dict, ordered by id"""
+        users = self._fresh()[0]
+        return [users[user_id] for user_id in sorted(users)]
+
+    def get(self, user_id: int) -> Optional[Dict]:
+        return self._fresh()[0].get(user_id)
+
+    def by_id(self) -> Dict[int, Dict]:
+        """Every user dict by id, for lookups in a loop; do not modify"""
+        return self._fresh()[0]
+
+    def get_by_name(self, name: str) -> Optional[Dict]:
+        """Exact (case-sensitive) name match"""
+        for user in self.search(name):
+            if user['name'] == name:
+                return user
+        return None
+
+    def search(self, term: str, limit: Optional[int] = None) -> List[Dict]:
+        """Users whose name contains ``term`` (case-insensitive).
+
+        Exact matches come first, then prefix matches, then other substring
+        matches, each group in name order.
+        """
+        users, names, _ = self._fresh()
+        key = term.casefold()
+        if not key:
+            matches = [user_id for _, user_id in names]
+        else:
+            # Prefix matches form one contiguous run in the sorted index
+            start = bisect_left(names, (key,))
+            prefix = []
+            for name, user_id in names[start:]:
+                if not name.startswith(key):
+                    break
+                prefix.append((name != key, user_id))
+            prefix_ids = {user_id for _, user_id in prefix}
+            matches = [user_id for _, user_id in sorted(prefix, key=lambda m: m[0])]
+            matches += [user_id for name, user_id in names
+                        if key in name and user_id not in prefix_ids]
+        if limit is not None:
+            matches = matches[:limit]
+        return [users[user_id] for user_id in matches]
+
+    def find(self, name: str) -> Optional[Dict]:
+        """Best single match for a name, as used by the chatbot"""
+        matches = self.search(name, limit=1)
+        return matches[0] if matches else None
+
+    def ids_matching(self, term: str) -> List[int]:
+        return [user['id'] for user in self.search(term)]
+
+
+user_directory = UserDirectory()